@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import requests
 import argparse
 import datetime
 import textwrap
@@ -9,18 +8,27 @@ import threading
 import itertools
 import time
 import json
+import hashlib
 import sys
 import os
 import csv
+import gzip
+import zlib
+import mmap
 import re
+import random
+import email.utils
+import urllib.parse
 import xml.etree.ElementTree as ET
-import subprocess
+import sqlite3
 import concurrent.futures
-from tqdm import tqdm
-from git import Repo, GitCommandError, RemoteProgress
-from google import genai
-from openai import OpenAI
-from jinja2 import Environment, FileSystemLoader
+import collections
+import contextlib
+import shutil
+
+# requests, tqdm, GitPython, google-genai, openai and jinja2 are imported in
+# the functions that use them, so --help, fast mode and plain lookups do not
+# pay for the optional dependencies at startup.
 
 VERSION = "0.13.0"
 
@@ -30,7 +38,9 @@ YELLOW = "\033[93m"
 ENDC = "\033[0m"
 
 CVE_GITHUB_URL = "https://raw.githubusercontent.com/CVEProject/cvelistV5/main/cves"
+CVELISTV5_REPO_URL = "https://github.com/CVEProject/cvelistV5.git"
 EPSS_API_URL = "https://api.first.org/data/v1/epss?cve={cve_id}"
+EPSS_BULK_URL = "https://epss.cyentia.com/epss_scores-current.csv.gz"
 CISA_URL = "https://www.cisa.gov/sites/default/files/feeds/known_exploited_vulnerabilities.json"
 NUCLEI_URL = (
     "https://raw.githubusercontent.com/projectdiscovery/nuclei-templates/main/cves.json"
@@ -44,6 +54,60 @@ HACKERONE_URL = "https://hackerone.com/graphql"
 CVSS_THRESHOLD = 6.0
 EPSS_THRESHOLD = 0.2
 
+FEED_CACHE_TTL = 3600
+DEFAULT_WORKERS = 8
+EPSS_BATCH_SIZE = 100
+AI_CACHE_TTL = 7 * 24 * 3600
+AI_TOKEN_BUDGET = 6000
+AI_MAX_REFERENCES = 10
+AI_WORKERS = 4
+CVE_RECORD_CACHE_SIZE = 1024
+SEARCH_INDEX_SCHEMA = 2
+KEV_SEARCH_FIELDS = ("cveID", "vendorProject", "product", "vulnerabilityName")
+AI_EXPECTED_OUTPUT_TOKENS = 1000
+HTTP_TIMEOUT = (10, 60)
+HTTP_POOL_HOSTS = 16
+HTTP_MAX_RETRIES = 4
+HTTP_MAX_RETRY_DELAY = 120
+HTTP_RETRY_STATUS_CODES = {429, 502, 503, 504}
+OFFLINE_BUNDLE_VERSION = 1
+OFFLINE_SNAPSHOTS_KEPT = 2
+OFFLINE_MAX_AGE = 7 * 24 * 3600
+
+# Requests per second allowed per upstream host; hosts not listed are not throttled.
+RATE_LIMITS = {
+    "api.first.org": 5,
+    "api.vulncheck.com": 5,
+    "poc-in-github.motikan2010.net": 2,
+    "hackerone.com": 2,
+    "packetstormsecurity.com": 1,
+}
+
+AI_MODELS = {
+    "openai": "gpt-4o",
+    "google": "gemini-2.0-flash",
+    "grok": "grok-2-latest",
+    "deepseek": "deepseek-chat",
+}
+# Requests and tokens per minute allowed per AI provider; override with "ai_rate_limits".
+AI_RATE_LIMITS = {
+    "openai": {"rpm": 60, "tpm": 30000},
+    "google": {"rpm": 15, "tpm": 1000000},
+    "grok": {"rpm": 60, "tpm": 100000},
+    "deepseek": {"rpm": 60, "tpm": 100000},
+}
+AI_FAILURE_PREFIXES = ("❌", "Google AI:", "Grok AI:", "DeepSeek:")
+AI_API_KEY_SETTINGS = {
+    "openai": "openai_api_key",
+    "google": "google_ai_api_key",
+    "grok": "grok_api_key",
+    "deepseek": "deepseek_api_key",
+}
+AI_BASE_URLS = {
+    "grok": "https://api.x.ai/v1",
+    "deepseek": "https://api.deepseek.com",
+}
+
 PRIORITY_COLORS = {
     "A+": "\033[91m",
     "A": "\033[31m",
@@ -53,19 +117,76 @@ PRIORITY_COLORS = {
 }
 
 
-def get_cve_repo_dir():
+feed_cache_stats = {
+    "hits": 0,
+    "misses": 0,
+    "revalidated": 0,
+    "stale": 0,
+    "bytes_downloaded": 0,
+    "bytes_saved": 0,
+}
+_feed_cache_stats_lock = threading.Lock()
+_feed_memory_cache = {}
+_feed_locks = collections.defaultdict(threading.RLock)
+_feed_locks_guard = threading.Lock()
+_http_session = None
+_http_session_lock = threading.Lock()
+_http_pool_size = DEFAULT_WORKERS
+_rate_limiters = {}
+_rate_limiters_lock = threading.Lock()
+_ai_rate_budgets = {}
+_ai_rate_budgets_lock = threading.Lock()
+_ai_clients = {}
+_ai_clients_lock = threading.Lock()
+_record_store_local = threading.local()
+_cve_record_cache = collections.OrderedDict()
+_cve_record_cache_lock = threading.Lock()
+cve_record_tiers = collections.Counter()
+
+
+debug_enabled = False
+offline_enabled = False
+http_cassette = None
+_run_settings = None
+
+
+def debug_print(message):
+    if debug_enabled:
+        print(message)
+
+
+def get_config_value(key, default=None):
     try:
-        base_dir = config.get("local_database_dir",
-                              os.path.expanduser("~/.sploitscan"))
+        return config.get(key, default)
     except NameError:
-        base_dir = os.path.expanduser("~/.sploitscan")
-    return os.path.join(base_dir, "cvelistV5")
+        return default
+
+
+def get_sploitscan_dir():
+    return get_config_value("local_database_dir", os.path.expanduser("~/.sploitscan"))
+
+
+def get_cve_repo_dir():
+    return os.path.join(get_sploitscan_dir(), "cvelistV5")
 
 
 def get_cve_local_dir():
     return os.path.join(get_cve_repo_dir(), "cves")
 
 
+def get_cve_record_path(cve_id):
+    """
+    Returns the path of a CVE record relative to cvelistV5/cves, e.g.
+    2024/21xxx/CVE-2024-21413.json, shared by the local clone and GitHub.
+    """
+    _, year, number = cve_id.split("-")
+    return f"{year}/{int(number) // 1000}xxx/{cve_id}.json"
+
+
+def get_cve_local_path(cve_id):
+    return os.path.join(get_cve_local_dir(), *get_cve_record_path(cve_id).split("/"))
+
+
 def parse_iso_date(date_string, date_format="%Y-%m-%d"):
     if not date_string:
         return ""
@@ -75,26 +196,56 @@ def parse_iso_date(date_string, date_format="%Y-%m-%d"):
         return date_string
 
 
-class CloneProgress(RemoteProgress):
-    def update(self, op_code, cur_count, max_count=None, message=''):
-        if max_count:
-            percent = (cur_count / max_count) * 100
-            print(f"🔄 Progress: {percent:.2f}% - {message}", end='\r')
-        else:
-            print(f"🔄 {message}", end='\r')
+def create_clone_progress():
+    from git import RemoteProgress
+
+    class CloneProgress(RemoteProgress):
+        def update(self, op_code, cur_count, max_count=None, message=''):
+            if max_count:
+                percent = (cur_count / max_count) * 100
+                print(f"🔄 Progress: {percent:.2f}% - {message}", end='\r')
+            else:
+                print(f"🔄 {message}", end='\r')
+
+    return CloneProgress()
+
+
+CLONE_OPTIONS = {
+    "full": [],
+    "shallow": ["--depth=1", "--single-branch"],
+    "partial": ["--filter=blob:none", "--single-branch"],
+    "sparse": ["--depth=1", "--single-branch", "--sparse"],
+}
 
 
-def clone_cvelistV5_repo():
+def clone_cvelistV5_repo(clone_mode=None):
+    """
+    Clones cvelistV5 into the local database directory, or pulls updates if it
+    already exists. `clone_mode` picks how much is downloaded on first clone:
+    "full" history, a "shallow" depth-1 clone, a "partial" blob-filtered clone
+    (blobs are fetched on checkout) or a "sparse" depth-1 checkout of cves/ only.
+    Later updates are incremental pulls in every mode.
+    """
+    from git import Repo, GitCommandError
+
     local_dir = get_cve_repo_dir()
-    repo_url = 'https://github.com/CVEProject/cvelistV5.git'
+    clone_mode = clone_mode or get_config_value("local_database_clone_mode", "full")
+    if clone_mode not in CLONE_OPTIONS:
+        print(f"❌ Unknown clone mode '{clone_mode}'. Use one of: {', '.join(CLONE_OPTIONS)}.")
+        return None
 
     if not os.path.exists(os.path.join(local_dir, '.git')):
         try:
-            print(f"📥 Cloning CVE List V5 into '{local_dir}'.")
-            print(
-                "⚠️ Warning: The repository is several GB in size and the download may take a while.")
-            Repo.clone_from(repo_url, local_dir, progress=CloneProgress())
+            print(f"📥 Cloning CVE List V5 into '{local_dir}' ({clone_mode} clone).")
+            if clone_mode == "full":
+                print(
+                    "⚠️ Warning: The repository is several GB in size and the download may take a while.")
+            repo = Repo.clone_from(CVELISTV5_REPO_URL, local_dir, progress=create_clone_progress(),
+                                   multi_options=CLONE_OPTIONS[clone_mode])
+            if clone_mode == "sparse":
+                repo.git.sparse_checkout("set", "cves")
             print("\n✅ CVE List V5 cloned successfully.")
+            save_sync_state(None, repo.head.commit.hexsha)
         except GitCommandError as e:
             print(f"❌ Error cloning cvelistV5: {e}")
             return None
@@ -106,15 +257,205 @@ def clone_cvelistV5_repo():
                     f"❌ Repository at '{local_dir}' is bare. Cannot pull updates.")
                 return None
             print(f"📥 Pulling updates in '{local_dir}'...")
+            previous_commit = repo.head.commit.hexsha
             repo.remotes.origin.pull()
+            commit = repo.head.commit.hexsha
             print("✅ Repository updated successfully.")
+            if commit != previous_commit:
+                save_sync_state(previous_commit, commit)
+                update_local_indexes(repo)
         except GitCommandError as e:
             print(f"❌ Error pulling updates: {e}")
             return None
     return local_dir
 
 
-def grep_local_db(keywords):
+def get_sync_state_path():
+    return os.path.join(get_sploitscan_dir(), "sync_state.json")
+
+
+def load_sync_state():
+    try:
+        with open(get_sync_state_path(), "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def save_sync_state(previous_commit, commit):
+    state = {
+        "previous_commit": previous_commit,
+        "commit": commit,
+        "synced_at": datetime.datetime.now().isoformat(timespec="seconds"),
+    }
+    try:
+        write_file_atomic(get_sync_state_path(), json.dumps(state, indent=4))
+    except OSError as e:
+        print(f"⚠️ Could not write sync state: {e}")
+
+
+def get_local_repo_commit():
+    try:
+        from git import Repo
+        return Repo(get_cve_repo_dir()).head.commit.hexsha
+    except Exception:
+        return None
+
+
+def get_cve_changes(repo, old_commit, new_commit):
+    """
+    Lists the CVE records touched between two commits of the cvelistV5 clone.
+    Returns the added/modified paths (relative to the repository) and the IDs
+    of deleted records.
+    """
+    updated, deleted = [], []
+    diff = repo.git.diff("--name-status", "--no-renames",
+                         old_commit, new_commit, "--", "cves")
+    for line in diff.splitlines():
+        status, _, path = line.partition("\t")
+        filename = os.path.basename(path)
+        if not (filename.startswith("CVE-") and filename.endswith(".json")):
+            continue
+        if status.startswith("D"):
+            deleted.append(filename[:-5])
+        else:
+            updated.append(path)
+    return updated, deleted
+
+
+def update_local_indexes(repo):
+    update_search_index(repo)
+    update_record_store(repo)
+
+
+def list_changed_cves(since="last-sync"):
+    """
+    Returns the CVEs added or modified in the local clone since the previous
+    sync ("last-sync"), since a date (YYYY-MM-DD) or since a git revision.
+    """
+    from git import Repo, GitCommandError
+
+    try:
+        repo = Repo(get_cve_repo_dir())
+    except Exception:
+        print("Local CVE database not found. Use -local to download it first.")
+        return []
+
+    try:
+        if since == "last-sync":
+            state = load_sync_state()
+            if not state.get("previous_commit"):
+                print("No previous sync recorded. Run -local again after the next update.")
+                return []
+            updated, _ = get_cve_changes(
+                repo, state["previous_commit"], state["commit"])
+        elif re.fullmatch(r"\d{4}-\d{2}-\d{2}", since):
+            # In a shallow or sparse clone the boundary commit has no parent, so
+            # git log reports its whole tree as added; leave it out.
+            boundaries = []
+            if repo.git.rev_parse("--is-shallow-repository") == "true":
+                with open(os.path.join(repo.git_dir, "shallow"), "r", encoding="utf-8") as file:
+                    boundaries = file.read().split()
+                since_time = datetime.datetime.strptime(since, "%Y-%m-%d").timestamp()
+                oldest = min(repo.commit(boundary).committed_date for boundary in boundaries)
+                if oldest >= since_time:
+                    print(f"⚠️ The local CVE database is a shallow clone starting at "
+                          f"{datetime.datetime.fromtimestamp(oldest):%Y-%m-%d}, so history since "
+                          f"{since} is not available. Use a later date or a full clone.")
+                    return []
+            updated = repo.git.log(f"--since={since}", "--diff-filter=AM", "--name-only",
+                                   "--format=", "HEAD", *(f"^{boundary}" for boundary in boundaries),
+                                   "--", "cves").splitlines()
+        else:
+            updated, _ = get_cve_changes(repo, since, "HEAD")
+    except GitCommandError as e:
+        print(f"❌ Error listing changes: {e}")
+        return []
+
+    cve_ids = sorted({
+        os.path.basename(path)[:-5]
+        for path in updated
+        if is_valid_cve_id(os.path.basename(path)[:-5])
+        and os.path.exists(os.path.join(repo.working_tree_dir, path))
+    })
+
+    if cve_ids:
+        header = f" {len(cve_ids)} CVE(s) changed since {since} "
+        line = "═" * len(header)
+        print(f"\n╔{line}╗")
+        print(f"║{header}║")
+        print(f"╚{line}╝\n")
+        print(", ".join(cve_ids))
+        print()
+    else:
+        print(f"No CVEs changed since {since}.")
+    return cve_ids
+
+
+def scan_cve_bucket(bucket_dir, keywords):
+    """
+    Runs in a worker process: lists one NNxxx directory with os.scandir and
+    returns the CVEs whose raw JSON contains every keyword (ASCII
+    case-insensitive), searching each file through mmap without decoding it.
+    """
+    patterns = [re.compile(re.escape(keyword.encode("utf-8")), re.IGNORECASE)
+                for keyword in keywords]
+    matches = []
+    with os.scandir(bucket_dir) as entries:
+        for entry in entries:
+            if not (entry.name.startswith("CVE-") and entry.name.endswith(".json")):
+                continue
+            try:
+                with open(entry.path, "rb") as file, \
+                        mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                    if all(pattern.search(content) for pattern in patterns):
+                        matches.append(entry.name[:-5])
+            except (OSError, ValueError):
+                # Empty files cannot be mapped and hold no keywords anyway.
+                continue
+    return matches
+
+
+def list_cve_buckets(local_dir, years=None):
+    buckets = []
+    with os.scandir(local_dir) as year_entries:
+        for year_entry in year_entries:
+            if not (year_entry.is_dir() and year_entry.name.isdigit()):
+                continue
+            if years and not years[0] <= int(year_entry.name) <= years[1]:
+                continue
+            with os.scandir(year_entry.path) as bucket_entries:
+                buckets.extend(entry.path for entry in bucket_entries if entry.is_dir())
+    return buckets
+
+
+def scan_local_cves(buckets, keywords, progress=None):
+    """
+    Yields the CVEs in `buckets` whose records contain every keyword, as soon
+    as the directory holding them has been scanned across a process pool.
+    """
+    try:
+        executor = concurrent.futures.ProcessPoolExecutor()
+    except (OSError, NotImplementedError) as e:
+        debug_print(f"Process pool unavailable, scanning in this process: {e}")
+        executor = None
+
+    if executor is None:
+        for bucket in buckets:
+            yield from scan_cve_bucket(bucket, keywords)
+            if progress:
+                progress.update(1)
+        return
+
+    with executor:
+        futures = [executor.submit(scan_cve_bucket, bucket, keywords) for bucket in buckets]
+        for future in concurrent.futures.as_completed(futures):
+            yield from future.result()
+            if progress:
+                progress.update(1)
+
+
+def grep_local_db(keywords, years=None):
     local_dir = get_cve_local_dir()
     if not os.path.exists(local_dir):
         print("Local CVE database not found.")
@@ -128,55 +469,591 @@ def grep_local_db(keywords):
     print(
         f"┌───[ 🕵️ Searching local database for keywords: {', '.join(keywords)} ]")
 
-    json_files = []
-    for root, _, files in os.walk(local_dir):
+    from tqdm import tqdm
+
+    buckets = list_cve_buckets(local_dir, years)
+    matching_files = []
+    with tqdm(total=len(buckets), desc="Scanning CVE directories") as progress:
+        for cve_id in scan_local_cves(buckets, keywords, progress):
+            matching_files.append(cve_id)
+            progress.set_postfix(matches=len(matching_files))
+
+    return matching_files if matching_files else None
+
+
+def get_search_index_path():
+    return os.path.join(get_sploitscan_dir(), "cve_index.db")
+
+
+def open_search_index(path=None):
+    connection = sqlite3.connect(path or get_search_index_path())
+    connection.executescript("""
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE IF NOT EXISTS cves (
+            id INTEGER PRIMARY KEY,
+            cve_id TEXT UNIQUE NOT NULL,
+            year INTEGER NOT NULL
+        );
+        CREATE VIRTUAL TABLE IF NOT EXISTS cve_fts USING fts5(body);
+        CREATE TABLE IF NOT EXISTS products (
+            cve_row INTEGER NOT NULL,
+            vendor TEXT NOT NULL,
+            product TEXT NOT NULL,
+            version TEXT,
+            less_than TEXT,
+            less_than_or_equal TEXT,
+            status TEXT
+        );
+        CREATE INDEX IF NOT EXISTS products_vendor ON products (vendor, product);
+        CREATE INDEX IF NOT EXISTS products_product ON products (product);
+        CREATE INDEX IF NOT EXISTS products_cve ON products (cve_row);
+        CREATE TABLE IF NOT EXISTS cpes (cve_row INTEGER NOT NULL, cpe TEXT NOT NULL);
+        CREATE INDEX IF NOT EXISTS cpes_cpe ON cpes (cpe);
+        CREATE INDEX IF NOT EXISTS cpes_cve ON cpes (cve_row);
+    """)
+    return connection
+
+
+def search_index_exists():
+    path = get_search_index_path()
+    if not os.path.isfile(path):
+        return False
+    try:
+        with sqlite3.connect(path) as connection:
+            row = connection.execute(
+                "SELECT value FROM meta WHERE key = 'built_at'").fetchone()
+        return row is not None
+    except sqlite3.Error:
+        return False
+
+
+def extract_cve_text(value):
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, dict):
+        return [text for item in value.values() for text in extract_cve_text(item)]
+    if isinstance(value, list):
+        return [text for item in value for text in extract_cve_text(item)]
+    return []
+
+
+def normalize_product_name(name):
+    return " ".join(str(name or "").lower().split())
+
+
+def extract_affected_products(record):
+    """
+    Flattens containers.cna.affected into (vendor, product, version,
+    less_than, less_than_or_equal, status) rows and the CPEs listed there.
+    """
+    rows, cpes = [], set()
+    affected = record.get("containers", {}).get("cna", {}).get("affected", [])
+    for item in affected if isinstance(affected, list) else []:
+        vendor = normalize_product_name(item.get("vendor"))
+        product = normalize_product_name(item.get("product") or item.get("packageName"))
+        cpes.update(cpe.lower() for cpe in item.get("cpes", []) if isinstance(cpe, str))
+        if not (vendor or product):
+            continue
+        versions = item.get("versions") or []
+        for version in versions:
+            rows.append((vendor, product, version.get("version"), version.get("lessThan"),
+                         version.get("lessThanOrEqual"), version.get("status")))
+        if not versions:
+            rows.append((vendor, product, None, None, None, item.get("defaultStatus")))
+    return rows, sorted(cpes)
+
+
+def iter_local_cve_files(local_dir=None):
+    for root, _, files in os.walk(local_dir or get_cve_local_dir()):
         for filename in files:
-            if filename.endswith('.json'):
-                json_files.append(os.path.join(root, filename))
+            if filename.startswith("CVE-") and filename.endswith(".json"):
+                yield os.path.join(root, filename)
+
+
+def index_cve_file(connection, file_path):
+    cve_id = os.path.splitext(os.path.basename(file_path))[0]
+    with open(file_path, "r", encoding="utf-8") as file:
+        record = json.load(file)
+    connection.execute(
+        "INSERT INTO cves (cve_id, year) VALUES (?, ?) "
+        "ON CONFLICT(cve_id) DO UPDATE SET year = excluded.year",
+        (cve_id, int(cve_id.split("-")[1])),
+    )
+    row_id = connection.execute(
+        "SELECT id FROM cves WHERE cve_id = ?", (cve_id,)).fetchone()[0]
+    connection.execute("DELETE FROM cve_fts WHERE rowid = ?", (row_id,))
+    connection.execute(
+        "INSERT INTO cve_fts (rowid, body) VALUES (?, ?)",
+        (row_id, "\n".join(extract_cve_text(record))),
+    )
+    rows, cpes = extract_affected_products(record)
+    connection.execute("DELETE FROM products WHERE cve_row = ?", (row_id,))
+    connection.execute("DELETE FROM cpes WHERE cve_row = ?", (row_id,))
+    connection.executemany(
+        "INSERT INTO products (cve_row, vendor, product, version, less_than, "
+        "less_than_or_equal, status) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [(row_id, *row) for row in rows],
+    )
+    connection.executemany(
+        "INSERT INTO cpes (cve_row, cpe) VALUES (?, ?)", [(row_id, cpe) for cpe in cpes])
 
-    def process_file(file_path):
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read().lower()
-                if all(kw in content for kw in keywords):
-                    return os.path.splitext(os.path.basename(file_path))[0]
-        except Exception as e:
-            print(f"Error reading file {file_path}: {e}")
+
+def delete_cve_from_index(connection, cve_id):
+    row = connection.execute(
+        "SELECT id FROM cves WHERE cve_id = ?", (cve_id,)).fetchone()
+    if row:
+        connection.execute("DELETE FROM cve_fts WHERE rowid = ?", (row[0],))
+        connection.execute("DELETE FROM products WHERE cve_row = ?", (row[0],))
+        connection.execute("DELETE FROM cpes WHERE cve_row = ?", (row[0],))
+        connection.execute("DELETE FROM cves WHERE id = ?", (row[0],))
+
+
+def update_search_index(repo):
+    """
+    Brings an existing search index up to the clone's HEAD by re-indexing only
+    the CVE files changed since the commit the index was built from.
+    """
+    from git import GitCommandError
+
+    if not search_index_exists():
+        return
+
+    connection = open_search_index()
+    row = connection.execute(
+        "SELECT value FROM meta WHERE key = 'commit'").fetchone()
+    indexed_commit = row[0] if row else None
+    commit = repo.head.commit.hexsha
+    if indexed_commit == commit:
+        connection.close()
+        return
+    if not indexed_commit:
+        print("⚠️ Search index has no recorded commit. Rebuild it with --build-index.")
+        connection.close()
+        return
+
+    try:
+        updated, deleted = get_cve_changes(repo, indexed_commit, commit)
+    except GitCommandError as e:
+        print(f"❌ Error diffing repository for search index update: {e}")
+        connection.close()
+        return
+
+    with connection:
+        for path in updated:
+            file_path = os.path.join(repo.working_tree_dir, path)
+            try:
+                index_cve_file(connection, file_path)
+            except (OSError, ValueError) as e:
+                print(f"Error indexing file {file_path}: {e}")
+        for cve_id in deleted:
+            delete_cve_from_index(connection, cve_id)
+        connection.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('commit', ?)", (commit,))
+    connection.close()
+    print(
+        f"✅ Search index updated: {len(updated)} CVE(s) re-indexed, {len(deleted)} removed.")
+
+
+def build_search_index():
+    """
+    Builds the SQLite FTS5 keyword index at ~/.sploitscan/cve_index.db from
+    the local cvelistV5 clone, replacing any previous index.
+    """
+    local_dir = get_cve_local_dir()
+    if not os.path.exists(local_dir):
+        print("Local CVE database not found. Use -local to download it first.")
+        return False
+
+    index_path = get_search_index_path()
+    tmp_path = f"{index_path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    print(f"┌───[ 🗂️ Building search index in '{index_path}' ]")
+    try:
+        connection = open_search_index(tmp_path)
+    except sqlite3.OperationalError as e:
+        print(f"❌ Could not create search index (SQLite FTS5 required): {e}")
+        return False
+
+    from tqdm import tqdm
+
+    with connection:
+        for file_path in tqdm(list(iter_local_cve_files(local_dir)), desc="Indexing CVE files"):
+            try:
+                index_cve_file(connection, file_path)
+            except (OSError, ValueError) as e:
+                print(f"Error indexing file {file_path}: {e}")
+        connection.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('built_at', ?)",
+            (datetime.datetime.now().isoformat(timespec="seconds"),),
+        )
+        connection.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('commit', ?)",
+            (get_local_repo_commit(),),
+        )
+        connection.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('schema', ?)",
+            (str(SEARCH_INDEX_SCHEMA),),
+        )
+    connection.execute("INSERT INTO cve_fts (cve_fts) VALUES ('optimize')")
+    connection.commit()
+    connection.close()
+    os.replace(tmp_path, index_path)
+    print("✅ Search index built successfully.\n")
+    return True
+
+
+def get_record_store_path():
+    return os.path.join(get_sploitscan_dir(), "cve_store.db")
+
+
+def open_record_store(path=None):
+    connection = sqlite3.connect(path or get_record_store_path())
+    connection.executescript("""
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE IF NOT EXISTS records (
+            cve_id TEXT PRIMARY KEY,
+            year INTEGER NOT NULL,
+            data BLOB NOT NULL
+        ) WITHOUT ROWID;
+    """)
+    return connection
+
+
+def store_cve_file(connection, file_path):
+    cve_id = os.path.splitext(os.path.basename(file_path))[0]
+    with open(file_path, "r", encoding="utf-8") as file:
+        record = json.load(file)
+    data = zlib.compress(json.dumps(record, separators=(",", ":")).encode("utf-8"))
+    connection.execute(
+        "INSERT OR REPLACE INTO records (cve_id, year, data) VALUES (?, ?, ?)",
+        (cve_id, int(cve_id.split("-")[1]), data),
+    )
+
+
+def get_record_store_connection():
+    """
+    Returns this thread's read-only connection to the record store, or None
+    if no store has been built.
+    """
+    path = get_record_store_path()
+    connection = getattr(_record_store_local, "connection", None)
+    if connection is not None and _record_store_local.path == path:
+        return connection
+    if not os.path.isfile(path):
+        return None
+    try:
+        connection = sqlite3.connect(f"file:{urllib.parse.quote(path)}?mode=ro", uri=True)
+        connection.execute("SELECT 1 FROM records LIMIT 1")
+    except sqlite3.Error as e:
+        debug_print(f"Record store unavailable: {e}")
         return None
+    _record_store_local.connection, _record_store_local.path = connection, path
+    return connection
 
-    matching_files = []
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        for result in tqdm(executor.map(process_file, json_files),
-                           total=len(json_files),
-                           desc="Processing CVE files"):
-            if result is not None:
-                matching_files.append(result)
 
-    return matching_files if matching_files else None
+def read_stored_cve_record(cve_id):
+    """
+    Looks a CVE up in the record store with a single indexed read. Returns
+    (None, None) when there is no store or it does not hold the CVE.
+    """
+    connection = get_record_store_connection()
+    if connection is None:
+        return None, None
+    try:
+        row = connection.execute(
+            "SELECT data FROM records WHERE cve_id = ?", (cve_id,)).fetchone()
+        if row is None:
+            return None, None
+        return json.loads(zlib.decompress(row[0])), None
+    except (sqlite3.Error, zlib.error, ValueError) as e:
+        return None, f"❌ Error reading {cve_id} from the record store: {e}"
+
+
+def update_record_store(repo):
+    """
+    Brings an existing record store up to the clone's HEAD by re-packing only
+    the CVE files changed since the commit it was built from.
+    """
+    from git import GitCommandError
+
+    if not os.path.isfile(get_record_store_path()):
+        return
+
+    connection = open_record_store()
+    row = connection.execute(
+        "SELECT value FROM meta WHERE key = 'commit'").fetchone()
+    stored_commit = row[0] if row else None
+    commit = repo.head.commit.hexsha
+    if stored_commit == commit:
+        connection.close()
+        return
+    if not stored_commit:
+        print("⚠️ Record store has no recorded commit. Rebuild it with --build-store.")
+        connection.close()
+        return
+
+    try:
+        updated, deleted = get_cve_changes(repo, stored_commit, commit)
+    except GitCommandError as e:
+        print(f"❌ Error diffing repository for record store update: {e}")
+        connection.close()
+        return
+
+    with connection:
+        for path in updated:
+            file_path = os.path.join(repo.working_tree_dir, path)
+            try:
+                store_cve_file(connection, file_path)
+            except (OSError, ValueError) as e:
+                print(f"Error storing file {file_path}: {e}")
+        connection.executemany(
+            "DELETE FROM records WHERE cve_id = ?", [(cve_id,) for cve_id in deleted])
+        connection.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('commit', ?)", (commit,))
+    connection.close()
+    print(
+        f"✅ Record store updated: {len(updated)} CVE(s) re-packed, {len(deleted)} removed.")
+
+
+def build_record_store():
+    """
+    Packs every record of the local cvelistV5 clone into one SQLite table of
+    zlib-compressed JSON at ~/.sploitscan/cve_store.db, replacing any previous
+    store. Fast mode and CVE lookups then read records from it instead of
+    opening one small file per CVE.
+    """
+    local_dir = get_cve_local_dir()
+    if not os.path.exists(local_dir):
+        print("Local CVE database not found. Use -local to download it first.")
+        return False
+
+    store_path = get_record_store_path()
+    tmp_path = f"{store_path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    print(f"┌───[ 🗄️ Building record store in '{store_path}' ]")
+    from tqdm import tqdm
+
+    connection = open_record_store(tmp_path)
+    with connection:
+        # Insert in key order so each year's records end up next to each other.
+        for file_path in tqdm(sorted(iter_local_cve_files(local_dir), key=os.path.basename),
+                              desc="Packing CVE files"):
+            try:
+                store_cve_file(connection, file_path)
+            except (OSError, ValueError) as e:
+                print(f"Error storing file {file_path}: {e}")
+        connection.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('built_at', ?)",
+            (datetime.datetime.now().isoformat(timespec="seconds"),),
+        )
+        connection.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('commit', ?)",
+            (get_local_repo_commit(),),
+        )
+    connection.execute("VACUUM")
+    connection.close()
+    os.replace(tmp_path, store_path)
+    print("✅ Record store built successfully.\n")
+    return True
+
+
+def build_fts_query(keywords):
+    """
+    Turns keywords into an FTS5 query. Every keyword must match (AND); a
+    keyword containing spaces is matched as a phrase, and the last word of each
+    keyword is matched as a prefix.
+    """
+    terms = []
+    for keyword in keywords:
+        keyword = keyword.strip()
+        if keyword:
+            terms.append('"' + keyword.replace('"', '""') + '"*')
+    return " AND ".join(terms)
+
+
+def parse_year_filter(value):
+    """
+    Parses a --year value such as "2023" or "2019-2023" into an inclusive
+    (start, end) range.
+    """
+    if not value:
+        return None
+    match = re.fullmatch(r"(\d{4})(?:-(\d{4}))?", value.strip())
+    if not match:
+        raise argparse.ArgumentTypeError(
+            f"Invalid year filter '{value}'. Use YYYY or YYYY-YYYY.")
+    start = int(match.group(1))
+    end = int(match.group(2) or start)
+    return (min(start, end), max(start, end))
+
+
+def cve_in_years(cve_id, years):
+    if not years:
+        return True
+    try:
+        year = int(cve_id.split("-")[1])
+    except (IndexError, ValueError):
+        return False
+    return years[0] <= year <= years[1]
 
 
-def search_cve_by_keywords(keywords):
+def search_local_index(keywords, years=None):
+    if isinstance(keywords, str):
+        keywords = [keywords]
+
+    print(
+        f"┌───[ 🗂️ Searching local index for keywords: {', '.join(keywords)} ]")
+
+    query = build_fts_query(keywords)
+    if not query:
+        return None
+
+    sql = ("SELECT cves.cve_id FROM cve_fts JOIN cves ON cves.id = cve_fts.rowid "
+           "WHERE cve_fts MATCH ?")
+    params = [query]
+    if years:
+        sql += " AND cves.year BETWEEN ? AND ?"
+        params.extend(years)
+
+    try:
+        with sqlite3.connect(get_search_index_path()) as connection:
+            rows = connection.execute(sql, params).fetchall()
+    except sqlite3.Error as e:
+        print(f"Error querying search index: {e}")
+        return None
+    return [row[0] for row in rows] or None
+
+
+def parse_version_key(version):
+    return tuple((1, int(part)) if part.isdigit() else (0, part)
+                 for part in re.findall(r"\d+|[a-z]+", str(version).lower()))
+
+
+def version_is_affected(version, start, less_than, less_than_or_equal, status):
+    """
+    Checks a version against one CVE 5 `versions` entry. Entries without
+    version data never match a version filter.
+    """
+    if status != "affected" or not start:
+        return False
+    key = parse_version_key(version)
+    if not (less_than or less_than_or_equal):
+        return start == "*" or key == parse_version_key(start)
+    if start not in ("0", "*") and key < parse_version_key(start):
+        return False
+    if less_than and less_than != "*":
+        return key < parse_version_key(less_than)
+    if less_than_or_equal and less_than_or_equal != "*":
+        return key <= parse_version_key(less_than_or_equal)
+    return True
+
+
+def build_name_filter(column, value):
+    """
+    Matches a normalized vendor/product/CPE column exactly, or by prefix when
+    the value ends with '*'. Prefixes use a range so the index still applies.
+    """
+    value = value.lower().strip()
+    if value.endswith("*"):
+        prefix = value.rstrip("*")
+        return f"{column} >= ? AND {column} < ?", [prefix, prefix + "\uffff"]
+    return f"{column} = ?", [value if column == "cpe" else normalize_product_name(value)]
+
+
+def search_products(vendor=None, product=None, cpe=None, version=None, years=None):
+    """
+    Queries the structured product index built from containers.cna.affected.
+    Vendor, product and CPE match exactly or by prefix ("apache*"); with a
+    version, only CVEs whose affected ranges contain it are returned.
+    """
+    if not search_index_exists():
+        print("Search index not found. Build it with --build-index first.")
+        return None
+
+    print(f"┌───[ 🗂️ Searching product index: vendor={vendor or '*'} product={product or '*'}"
+          f"{f' cpe={cpe}' if cpe else ''}{f' version={version}' if version else ''} ]")
+
+    conditions, params = [], []
+    for column, value in (("products.vendor", vendor), ("products.product", product)):
+        if value:
+            condition, values = build_name_filter(column, value)
+            conditions.append(condition)
+            params.extend(values)
+    if cpe:
+        condition, values = build_name_filter("cpe", cpe)
+        conditions.append(f"cves.id IN (SELECT cve_row FROM cpes WHERE {condition})")
+        params.extend(values)
+    if years:
+        conditions.append("cves.year BETWEEN ? AND ?")
+        params.extend(years)
+    if not conditions:
+        return None
+
+    sql = ("SELECT cves.cve_id, products.version, products.less_than, "
+           "products.less_than_or_equal, products.status "
+           "FROM products JOIN cves ON cves.id = products.cve_row WHERE "
+           + " AND ".join(conditions))
+    try:
+        with sqlite3.connect(get_search_index_path()) as connection:
+            schema = connection.execute(
+                "SELECT value FROM meta WHERE key = 'schema'").fetchone()
+            if not schema or int(schema[0]) < SEARCH_INDEX_SCHEMA:
+                print("⚠️ The search index predates product search. Rebuild it with --build-index.")
+                return None
+            rows = connection.execute(sql, params).fetchall()
+    except sqlite3.Error as e:
+        print(f"Error querying product index: {e}")
+        return None
+
+    cve_ids = sorted({
+        row[0] for row in rows
+        if not version or version_is_affected(version, *row[1:])
+    })
+    if cve_ids:
+        header = f" Found {len(cve_ids)} CVE(s) for the product query "
+        line = "═" * len(header)
+        print(f"\n╔{line}╗")
+        print(f"║{header}║")
+        print(f"╚{line}╝\n")
+        print(", ".join(cve_ids))
+        print()
+    return cve_ids or None
+
+
+def search_cve_by_keywords(keywords, years=None):
     cve_ids = set()
 
-    local_cve_ids = grep_local_db(keywords)
+    if search_index_exists():
+        local_cve_ids = search_local_index(keywords, years)
+    else:
+        local_cve_ids = grep_local_db(keywords, years)
     if local_cve_ids:
         cve_ids.update(local_cve_ids)
 
-    try:
-        cisa_response = requests.get(CISA_URL)
-        cisa_response.raise_for_status()
-        cisa_data = cisa_response.json()
-        for item in cisa_data.get("vulnerabilities", []):
-            item_str = json.dumps(item).lower()
-            if all(kw in item_str for kw in [k.lower() for k in keywords]):
-                cve_ids.add(item["cveID"])
-    except requests.RequestException as e:
-        print(f"Error fetching data from CISA: {e}")
+    cisa_content, cisa_error = fetch_cached_feed("cisa_kev", CISA_URL)
+    if cisa_error:
+        print(f"Error fetching data from CISA: {cisa_error}")
+    else:
+        try:
+            cisa_data = json.loads(cisa_content)
+            for item in cisa_data.get("vulnerabilities", []):
+                # Only the naming fields: notes and URLs would match almost any vendor.
+                item_str = " ".join(
+                    str(item.get(field, "")) for field in KEV_SEARCH_FIELDS).lower()
+                if all(kw in item_str for kw in [k.lower() for k in keywords]):
+                    cve_ids.add(item["cveID"])
+        except json.JSONDecodeError as e:
+            print(f"Error parsing data from CISA: {e}")
 
-    try:
-        nuclei_response = requests.get(NUCLEI_URL)
-        nuclei_response.raise_for_status()
-        for line in nuclei_response.text.splitlines():
+    nuclei_content, nuclei_error = fetch_cached_feed("nuclei_cves", NUCLEI_URL)
+    if nuclei_error:
+        print(f"Error fetching data from Nuclei Templates: {nuclei_error}")
+    else:
+        for line in nuclei_content.decode("utf-8").splitlines():
             try:
                 line_lower = line.lower()
                 if all(kw in line_lower for kw in [k.lower() for k in keywords]):
@@ -184,8 +1061,8 @@ def search_cve_by_keywords(keywords):
                     cve_ids.add(template["ID"])
             except Exception:
                 pass
-    except requests.RequestException as e:
-        print(f"Error fetching data from Nuclei Templates: {e}")
+
+    cve_ids = {cve_id for cve_id in cve_ids if cve_in_years(cve_id, years)}
 
     if cve_ids:
         header = f" Found {len(cve_ids)} CVE(s) matching: {' '.join(keywords)} "
@@ -243,60 +1120,775 @@ def extract_cvss_info(cve_data):
     return str(base_score), str(base_severity), str(vector)
 
 
+def configure_http_session(pool_size=DEFAULT_WORKERS):
+    """
+    Sizes the keep-alive session shared by every fetch: each host keeps up to
+    `pool_size` open connections so a full worker pool can reuse them. The
+    session itself (and requests) is only created on the first fetch, so runs
+    served from local data never load it.
+    """
+    global _http_session, _http_pool_size
+    with _http_session_lock:
+        previous, _http_session = _http_session, None
+        _http_pool_size = pool_size
+    if previous is not None:
+        previous.close()
+
+
+def get_http_session():
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            import requests
+
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=HTTP_POOL_HOSTS, pool_maxsize=_http_pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _http_session = session
+        return _http_session
+
+
+def get_http_timeout():
+    timeout = get_config_value("http_timeout", HTTP_TIMEOUT)
+    return tuple(timeout) if isinstance(timeout, list) else timeout
+
+
+class HostRateLimiter:
+    """
+    Token bucket for a single upstream host. The refill rate halves whenever
+    the host pushes back and creeps back up to the configured rate on success.
+    """
+
+    def __init__(self, rate):
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.capacity = max(1.0, self.rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens +
+                                  (now - self.updated) * self.rate)
+                self.updated = now
+                wait = self.blocked_until - now
+                if wait <= 0:
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def block(self, delay):
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+            self.tokens = 0
+
+    def throttle(self, delay):
+        with self.lock:
+            self.rate = max(self.max_rate / 16, self.rate / 2)
+        self.block(delay)
+
+    def recover(self):
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate * 1.1)
+
+
+def get_rate_limiter(host):
+    rates = {**RATE_LIMITS, **get_config_value("rate_limits", {})}
+    if not rates.get(host):
+        return None
+    with _rate_limiters_lock:
+        if host not in _rate_limiters:
+            _rate_limiters[host] = HostRateLimiter(rates[host])
+        return _rate_limiters[host]
+
+
+def parse_rate_limit_delay(value):
+    """
+    Converts a Retry-After or rate-limit reset header into seconds from now.
+    Accepts delta seconds, epoch timestamps and HTTP dates.
+    """
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+        return max(0.0, seconds - time.time()) if seconds > 1e9 else max(0.0, seconds)
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def get_retry_delay(response, attempt):
+    if response is not None:
+        for header in ("Retry-After", "X-RateLimit-Reset", "RateLimit-Reset"):
+            delay = parse_rate_limit_delay(response.headers.get(header))
+            if delay is not None:
+                return min(delay, get_config_value("http_max_retry_delay", HTTP_MAX_RETRY_DELAY))
+    return min(2 ** attempt, HTTP_MAX_RETRY_DELAY) * random.uniform(0.5, 1.5)
+
+
+class HttpCassette:
+    """
+    Records every response send_request() receives into `directory` (--record),
+    or serves them back from it without any network access (--replay).
+    Interactions are keyed by method, final URL and JSON body, not headers.
+    `latency` delays each replayed response by that many seconds, or by the
+    originally measured time when it is "recorded".
+    """
+
+    def __init__(self, directory, mode, latency=None):
+        self.directory = directory
+        self.mode = mode
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.stats = collections.Counter()
+
+    def get_key(self, method, url, kwargs):
+        import requests
+
+        full_url = requests.Request(method, url, params=kwargs.get("params")).prepare().url
+        body = json.dumps(kwargs.get("json"), sort_keys=True)
+        key = hashlib.sha256(f"{method}\n{full_url}\n{body}".encode("utf-8")).hexdigest()
+        return key, full_url
+
+    def record(self, method, url, kwargs, response, elapsed):
+        key, full_url = self.get_key(method, url, kwargs)
+        meta = {
+            "method": method,
+            "url": full_url,
+            "status_code": response.status_code,
+            "reason": response.reason,
+            "headers": dict(response.headers),
+            "encoding": response.encoding,
+            "elapsed": elapsed,
+        }
+        with self.lock:
+            write_file_atomic(os.path.join(self.directory, f"{key}.body"), response.content)
+            write_file_atomic(os.path.join(self.directory, f"{key}.json"),
+                              json.dumps(meta, indent=4))
+            self.stats["recorded"] += 1
+
+    def replay(self, method, url, kwargs):
+        import requests
+
+        key, full_url = self.get_key(method, url, kwargs)
+        try:
+            with open(os.path.join(self.directory, f"{key}.json"), "r", encoding="utf-8") as file:
+                meta = json.load(file)
+            with open(os.path.join(self.directory, f"{key}.body"), "rb") as file:
+                content = file.read()
+        except (OSError, json.JSONDecodeError):
+            with self.lock:
+                self.stats["missing"] += 1
+            raise requests.exceptions.ConnectionError(
+                f"{method} {full_url} is not in the replay cassette")
+
+        delay = meta.get("elapsed", 0) if self.latency == "recorded" else self.latency
+        if delay:
+            time.sleep(delay)
+        response = requests.Response()
+        response.status_code = meta["status_code"]
+        response.reason = meta.get("reason")
+        response.headers.update(meta.get("headers", {}))
+        response.encoding = meta.get("encoding")
+        response.url = full_url
+        response._content = content
+        with self.lock:
+            self.stats["replayed"] += 1
+        return response
+
+
+def parse_replay_latency(value):
+    if value == "recorded":
+        return value
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"Invalid replay latency '{value}'. Use seconds (e.g. 0.05) or 'recorded'.")
+
+
+def send_request(method, url, **kwargs):
+    """
+    Sends a request through the shared session, waiting for the host's rate
+    limiter first. 429/5xx responses and connection failures are retried with
+    jittered backoff, honouring Retry-After and rate-limit reset headers.
+    With --record/--replay, responses are saved to or served from a cassette.
+    """
+    import requests
+
+    if http_cassette and http_cassette.mode == "replay":
+        return http_cassette.replay(method, url, kwargs)
+    if offline_enabled:
+        raise requests.exceptions.ConnectionError(
+            f"network access to {urllib.parse.urlsplit(url).hostname} is disabled in offline mode")
+    limiter = get_rate_limiter(urllib.parse.urlsplit(url).hostname)
+    max_retries = get_config_value("http_max_retries", HTTP_MAX_RETRIES)
+
+    started = time.perf_counter()
+    for attempt in range(max_retries + 1):
+        if limiter:
+            limiter.acquire()
+        try:
+            response = get_http_session().request(
+                method, url, timeout=get_http_timeout(), **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            if attempt == max_retries:
+                raise
+            time.sleep(get_retry_delay(None, attempt))
+            continue
+
+        if response.status_code in HTTP_RETRY_STATUS_CODES and attempt < max_retries:
+            delay = get_retry_delay(response, attempt)
+            if limiter:
+                limiter.throttle(delay)
+            else:
+                time.sleep(delay)
+            continue
+
+        if limiter:
+            remaining = response.headers.get(
+                "X-RateLimit-Remaining", response.headers.get("RateLimit-Remaining"))
+            if remaining == "0":
+                limiter.block(get_retry_delay(response, attempt))
+            elif response.ok:
+                limiter.recover()
+        if http_cassette:
+            http_cassette.record(method, url, kwargs, response, time.perf_counter() - started)
+        return response
+
+
 def fetch_data(url, params=None, headers=None):
+    import requests
+
     try:
-        response = requests.get(url, params=params, headers=headers)
+        response = send_request("GET", url, params=params, headers=headers)
         response.raise_for_status()
         return response
     except requests.exceptions.RequestException as e:
         return f"❌ Error fetching data from {url}: {e}"
 
 
-def fetch_json_data(url, params=None, headers=None):
-    response = fetch_data(url, params=params, headers=headers)
-    if isinstance(response, str):
-        return None, response
-    try:
-        return response.json(), None
-    except json.JSONDecodeError as e:
-        return None, f"❌ Error parsing JSON data from {url}: {e}"
+def fetch_json_data(url, params=None, headers=None):
+    response = fetch_data(url, params=params, headers=headers)
+    if isinstance(response, str):
+        return None, response
+    try:
+        return response.json(), None
+    except json.JSONDecodeError as e:
+        return None, f"❌ Error parsing JSON data from {url}: {e}"
+
+
+def get_feed_cache_dir():
+    return os.path.join(get_sploitscan_dir(), "cache", "feeds")
+
+
+def write_file_atomic(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    mode = "wb" if isinstance(content, bytes) else "w"
+    with open(tmp_path, mode) as file:
+        file.write(content)
+    os.replace(tmp_path, path)
+
+
+def get_feed_lock(name):
+    with _feed_locks_guard:
+        return _feed_locks[name]
+
+
+def fetch_cached_feed(name, url):
+    """
+    Returns the raw bytes of a bulk feed, downloading it at most once per run.
+    The copy under ~/.sploitscan/cache/feeds is served as-is while it is younger
+    than `feed_cache_ttl` seconds and revalidated with ETag/Last-Modified after
+    that. If the upstream is unreachable, a stale copy is served instead.
+    """
+    with get_feed_lock(name):
+        return _fetch_cached_feed(name, url)
+
+
+def count_feed_cache(event, byte_counter=None, size=0):
+    # Feeds are fetched under different per-feed locks, so the shared counters
+    # need their own.
+    with _feed_cache_stats_lock:
+        feed_cache_stats[event] += 1
+        if byte_counter:
+            feed_cache_stats[byte_counter] += size
+
+
+def _fetch_cached_feed(name, url):
+    if name in _feed_memory_cache:
+        content = _feed_memory_cache[name]
+        count_feed_cache("hits", "bytes_saved", len(content))
+        return content, None
+
+    if offline_enabled:
+        content, error = read_offline_feed(name)
+        if error:
+            return None, error
+        _feed_memory_cache[name] = content
+        return content, None
+
+    if http_cassette:
+        # Cassettes must hold every feed, whatever state the disk cache is in.
+        response = fetch_data(url)
+        if isinstance(response, str):
+            return None, response
+        _feed_memory_cache[name] = response.content
+        return response.content, None
+
+    cache_dir = get_feed_cache_dir()
+    body_path = os.path.join(cache_dir, f"{name}.body")
+    meta_path = os.path.join(cache_dir, f"{name}.meta.json")
+
+    meta, content = {}, None
+    try:
+        with open(meta_path, "r", encoding="utf-8") as file:
+            meta = json.load(file)
+        with open(body_path, "rb") as file:
+            content = file.read()
+    except (OSError, json.JSONDecodeError):
+        meta, content = {}, None
+
+    ttl = get_config_value("feed_cache_ttl", FEED_CACHE_TTL)
+    if content is not None and time.time() - meta.get("fetched_at", 0) < ttl:
+        count_feed_cache("hits", "bytes_saved", len(content))
+        _feed_memory_cache[name] = content
+        return content, None
+
+    headers = {}
+    if content is not None:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    response = fetch_data(url, headers=headers or None)
+    if isinstance(response, str):
+        if content is None:
+            return None, response
+        print(f"⚠️ Using stale cached copy of {name}: {response}")
+        count_feed_cache("stale")
+        _feed_memory_cache[name] = content
+        return content, None
+
+    if response.status_code == 304 and content is not None:
+        count_feed_cache("revalidated", "bytes_saved", len(content))
+    else:
+        content = response.content
+        count_feed_cache("misses", "bytes_downloaded", len(content))
+        meta = {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "size": len(content),
+        }
+    meta["fetched_at"] = time.time()
+
+    try:
+        write_file_atomic(body_path, content)
+        write_file_atomic(meta_path, json.dumps(meta))
+    except OSError as e:
+        print(f"⚠️ Could not write feed cache for {name}: {e}")
+
+    _feed_memory_cache[name] = content
+    return content, None
+
+
+def save_feed_cache_stats():
+    """
+    Adds this run's feed cache counters to the running totals kept in
+    ~/.sploitscan/cache/feeds/stats.json and returns the updated totals.
+    """
+    with _feed_cache_stats_lock:
+        run_stats = dict(feed_cache_stats)
+    if not any(run_stats.values()):
+        return None
+
+    stats_path = os.path.join(get_feed_cache_dir(), "stats.json")
+    try:
+        with open(stats_path, "r", encoding="utf-8") as file:
+            totals = json.load(file)
+    except (OSError, json.JSONDecodeError):
+        totals = {}
+
+    for key, value in run_stats.items():
+        totals[key] = totals.get(key, 0) + value
+    totals["updated_at"] = datetime.datetime.now().isoformat(timespec="seconds")
+
+    try:
+        write_file_atomic(stats_path, json.dumps(totals, indent=4))
+    except OSError as e:
+        print(f"⚠️ Could not write feed cache stats: {e}")
+    return totals
+
+
+OFFLINE_FEEDS = {
+    "cisa_kev": CISA_URL,
+    "nuclei_cves": NUCLEI_URL,
+    "exploitdb": EXPLOITDB_URL,
+    "epss_scores": EPSS_BULK_URL,
+}
+
+
+def get_offline_dir():
+    return os.path.join(get_sploitscan_dir(), "offline")
+
+
+def load_offline_manifest():
+    try:
+        with open(os.path.join(get_offline_dir(), "manifest.json"), "r", encoding="utf-8") as file:
+            manifest = json.load(file)
+    except (OSError, json.JSONDecodeError):
+        return None
+    return manifest if manifest.get("bundle_version") == OFFLINE_BUNDLE_VERSION else None
+
+
+def read_offline_feed(name):
+    manifest = load_offline_manifest()
+    if not manifest or name not in manifest.get("sources", {}):
+        return None, f"❌ {name} is not in the offline snapshot. Run --sync first."
+    path = os.path.join(get_offline_dir(), "snapshots", manifest["snapshot"], f"{name}.body")
+    try:
+        with open(path, "rb") as file:
+            return file.read(), None
+    except OSError as e:
+        return None, f"❌ Error reading {name} from the offline snapshot: {e}"
+
+
+def load_feed_cache_meta(name):
+    try:
+        with open(os.path.join(get_feed_cache_dir(), f"{name}.meta.json"), "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def sync_offline_bundle(clone_mode=None):
+    """
+    Clones or pulls the local cvelistV5 database and snapshots every bulk feed
+    into ~/.sploitscan/offline/snapshots/<id>, then points manifest.json at
+    it. --offline scans resolve only from that snapshot and the clone. A feed
+    that cannot be refreshed is carried over from the previous snapshot.
+    """
+    print("┌───[ 📦 Offline snapshot ]")
+    if not clone_cvelistV5_repo(clone_mode=clone_mode):
+        print("⚠️ The local CVE database could not be updated; offline CVE records may be missing.")
+
+    previous = load_offline_manifest()
+    snapshot = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    snapshot_dir = os.path.join(get_offline_dir(), "snapshots", snapshot)
+    sources = {}
+    for name, url in OFFLINE_FEEDS.items():
+        content, error = fetch_cached_feed(name, url)
+        source = {"url": url, "fetched_at": load_feed_cache_meta(name).get("fetched_at", time.time())}
+        if error:
+            content, _ = read_offline_feed(name) if previous else (None, None)
+            if content is None:
+                print(f"❌ {name}: {error}")
+                continue
+            print(f"⚠️ {name}: {error} Keeping the copy from snapshot {previous['snapshot']}.")
+            source = dict(previous["sources"][name])
+        source.update(size=len(content), sha256=hashlib.sha256(content).hexdigest())
+        write_file_atomic(os.path.join(snapshot_dir, f"{name}.body"), content)
+        sources[name] = source
+        print(f"| {name}: {len(content) / 1024:.0f} KiB")
+
+    manifest = {
+        "bundle_version": OFFLINE_BUNDLE_VERSION,
+        "snapshot": snapshot,
+        "created_at": time.time(),
+        "cvelistV5_commit": get_local_repo_commit(),
+        "sources": sources,
+    }
+    manifest_json = json.dumps(manifest, indent=4)
+    write_file_atomic(os.path.join(snapshot_dir, "manifest.json"), manifest_json)
+    write_file_atomic(os.path.join(get_offline_dir(), "manifest.json"), manifest_json)
+
+    snapshots_dir = os.path.join(get_offline_dir(), "snapshots")
+    for old_snapshot in sorted(os.listdir(snapshots_dir))[:-OFFLINE_SNAPSHOTS_KEPT]:
+        shutil.rmtree(os.path.join(snapshots_dir, old_snapshot), ignore_errors=True)
+
+    print(f"└ ✅ Snapshot {snapshot} saved with {len(sources)}/{len(OFFLINE_FEEDS)} feed(s).\n")
+    return manifest
+
+
+def format_age(seconds):
+    days, remainder = divmod(int(max(seconds, 0)), 86400)
+    hours, remainder = divmod(remainder, 3600)
+    return f"{days}d {hours}h" if days else f"{hours}h {remainder // 60}m"
+
+
+def display_offline_snapshot(manifest):
+    oldest = min((source["fetched_at"] for source in manifest["sources"].values()),
+                 default=manifest["created_at"])
+    age = time.time() - oldest
+    commit = (manifest.get("cvelistV5_commit") or "none")[:12]
+    print(f"📦 Offline mode: snapshot {manifest['snapshot']}, data {format_age(age)} old, "
+          f"cvelistV5 {commit}.")
+    if age > get_config_value("offline_max_age", OFFLINE_MAX_AGE):
+        print("⚠️ The offline snapshot is stale. Run --sync on a connected host to refresh it.")
+    missing = sorted(set(OFFLINE_FEEDS) - set(manifest["sources"]))
+    if missing:
+        print(f"⚠️ Missing from the snapshot: {', '.join(missing)}")
+    print()
+
+
+def read_local_cve_record(cve_id):
+    cve_path = get_cve_local_path(cve_id)
+    try:
+        with open(cve_path, "r", encoding="utf-8") as file:
+            return json.load(file), None
+    except FileNotFoundError:
+        return None, f"❌ {cve_id} is not in the local CVE database."
+    except (OSError, json.JSONDecodeError) as e:
+        return None, f"❌ Error reading {cve_path}: {e}"
+
+
+def fetch_github_cve_data(cve_id):
+    return fetch_json_data(f"{CVE_GITHUB_URL}/{get_cve_record_path(cve_id)}")
+
+
+def resolve_cve_record(cve_id):
+    """
+    Returns the cvelistV5 record for a CVE from the first tier that has it:
+    the in-memory LRU, the record store, the local clone, then GitHub (never
+    in offline mode). The serving tier is counted in `cve_record_tiers`.
+    """
+    with _cve_record_cache_lock:
+        if cve_id in _cve_record_cache:
+            _cve_record_cache.move_to_end(cve_id)
+            cve_record_tiers["memory"] += 1
+            return _cve_record_cache[cve_id], None
+
+    record, error = read_stored_cve_record(cve_id)
+    tier = "store"
+    if error:
+        debug_print(error)
+    if record is None:
+        record, error = read_local_cve_record(cve_id)
+        tier = "local"
+    if record is None and not offline_enabled:
+        record, error = fetch_github_cve_data(cve_id)
+        tier = "remote"
+    if record is None:
+        return None, error
+
+    debug_print(f"{cve_id} record served from {tier}.")
+    with _cve_record_cache_lock:
+        cve_record_tiers[tier] += 1
+        _cve_record_cache[cve_id] = record
+        while len(_cve_record_cache) > CVE_RECORD_CACHE_SIZE:
+            _cve_record_cache.popitem(last=False)
+    return record, None
+
+
+def fetch_epss_score(cve_id):
+    if offline_enabled:
+        index, error = fetch_feed_index("epss_scores", EPSS_BULK_URL, build_epss_index)
+        if error:
+            return None, error
+        entry = index.get(cve_id)
+        return {"status": "OK", "data": [entry] if entry else []}, None
+    return fetch_json_data(EPSS_API_URL.format(cve_id=cve_id))
+
+
+def build_epss_index(content):
+    lines = gzip.decompress(content).decode("utf-8").splitlines()
+    score_date = None
+    if lines and lines[0].startswith("#"):
+        metadata = dict(
+            item.split(":", 1) for item in lines.pop(0).lstrip("#").split(",") if ":" in item
+        )
+        score_date = metadata.get("score_date")
+    index = {}
+    for row in csv.DictReader(lines):
+        index[row["cve"]] = {
+            "cve": row["cve"],
+            "epss": row["epss"],
+            "percentile": row["percentile"],
+            "date": parse_iso_date(score_date) if score_date else None,
+        }
+    return index
+
+
+class EpssBatcher:
+    """
+    Collects EPSS lookups and resolves them with one API call per
+    `batch_size` CVEs, or from the cached daily bulk file when the config sets
+    "epss_source": "bulk". Each lookup returns a future that yields the same
+    (data, error) pair as fetch_epss_score.
+    """
+
+    def __init__(self, executor, batch_size=EPSS_BATCH_SIZE, source="api"):
+        self.executor = executor
+        self.batch_size = batch_size
+        self.source = source
+        self.futures = {}
+        self.queued = []
+        self.lock = threading.Lock()
+
+    def request(self, cve_id):
+        with self.lock:
+            if cve_id in self.futures:
+                return self.futures[cve_id]
+            future = concurrent.futures.Future()
+            self.futures[cve_id] = future
+            self.queued.append(cve_id)
+            if len(self.queued) >= self.batch_size:
+                self._dispatch()
+        return future
+
+    def ensure_dispatched(self, cve_id):
+        with self.lock:
+            if cve_id in self.queued:
+                self._dispatch()
+
+    def flush(self):
+        with self.lock:
+            if self.queued:
+                self._dispatch()
+
+    def _dispatch(self):
+        batch = [(cve_id, self.futures[cve_id]) for cve_id in self.queued]
+        self.queued = []
+        resolve = self._resolve_bulk if self.source == "bulk" else self._resolve_api
+        self.executor.submit(self._resolve_batch, resolve, batch)
+
+    def _resolve_batch(self, resolve, batch):
+        try:
+            scores, error = resolve([cve_id for cve_id, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for cve_id, future in batch:
+            if error:
+                future.set_result((None, error))
+            else:
+                entry = scores.get(cve_id)
+                future.set_result(
+                    ({"status": "OK", "data": [entry] if entry else []}, None))
+
+    def _resolve_api(self, cve_ids):
+        # The API returns 100 rows unless told otherwise, so ask for the whole batch.
+        data, error = fetch_json_data(EPSS_API_URL.format(cve_id=",".join(cve_ids)),
+                                      params={"limit": len(cve_ids)})
+        if error:
+            return None, error
+        return {entry["cve"]: entry for entry in data.get("data", [])}, None
+
+    def _resolve_bulk(self, cve_ids):
+        return fetch_feed_index("epss_scores", EPSS_BULK_URL, build_epss_index)
+
+
+def read_ahead_epss(cve_ids, epss_batcher):
+    """
+    Yields `cve_ids` unchanged while queueing their EPSS lookups one batch
+    ahead, so a streamed import still fills whole EPSS batches instead of
+    sending whatever the display window holds.
+    """
+    window = collections.deque()
+    for cve_id in cve_ids:
+        window.append(cve_id)
+        if is_valid_cve_id(cve_id.upper()):
+            epss_batcher.request(cve_id.upper())
+        if len(window) > epss_batcher.batch_size:
+            yield window.popleft()
+    # Nothing more will join the last partial batch.
+    epss_batcher.flush()
+    yield from window
+
+
+def build_cisa_index(content):
+    index = {}
+    for vulnerability in json.loads(content).get("vulnerabilities", []):
+        ransomware_use = vulnerability.get("knownRansomwareCampaignUse", "Unknown")
+        index[vulnerability["cveID"]] = {
+            "cveID": vulnerability["cveID"],
+            "vendorProject": vulnerability.get("vendorProject"),
+            "product": vulnerability.get("product"),
+            "vulnerabilityName": vulnerability.get("vulnerabilityName"),
+            "dateAdded": vulnerability.get("dateAdded"),
+            "dueDate": vulnerability.get("dueDate"),
+            "knownRansomwareCampaignUse": ransomware_use,
+            "cisa_status": "Yes",
+            "ransomware_use": ransomware_use,
+        }
+    return index
+
+
+def build_nuclei_index(content):
+    index = {}
+    for line in content.splitlines():
+        if line:
+            template = json.loads(line)
+            index.setdefault(template["ID"], template)
+    return index
+
+
+def build_exploitdb_index(content):
+    csv_reader = csv.reader(content.decode("utf-8").splitlines(), delimiter=",")
+    header = next(csv_reader)
+    codes_index = header.index("codes")
+    index = {}
+    for row in csv_reader:
+        for code in row[codes_index].split(";"):
+            if code.startswith("CVE-"):
+                index.setdefault(code, []).append({"id": row[0], "date": row[3]})
+    return index
+
+
+_feed_indexes = {}
 
 
-def fetch_github_cve_data(cve_id):
-    cve_year = cve_id.split("-")[1]
-    cve_num = int(cve_id.split("-")[2])
-    url = f"{CVE_GITHUB_URL}/{cve_year}/{cve_num // 1000}xxx/{cve_id}.json"
-    return fetch_json_data(url)
+def fetch_feed_index(name, url, build_index):
+    """
+    Returns a CVE-keyed index over a bulk feed. The index is built once per
+    feed download and reused for every CVE in the run.
+    """
+    with get_feed_lock(name):
+        return _fetch_feed_index(name, url, build_index)
 
 
-def fetch_epss_score(cve_id):
-    return fetch_json_data(EPSS_API_URL.format(cve_id=cve_id))
+def _fetch_feed_index(name, url, build_index):
+    content, error = fetch_cached_feed(name, url)
+    if error:
+        return None, error
+
+    cached = _feed_indexes.get(name)
+    if cached and cached[0] is content:
+        return cached[1], None
+
+    try:
+        index = build_index(content)
+    except (ValueError, KeyError, IndexError, StopIteration, csv.Error, OSError) as e:
+        return None, f"❌ Error parsing data from {url}: {e}"
+    _feed_indexes[name] = (content, index)
+    return index, None
 
 
 def fetch_cisa_data():
-    data, error = fetch_json_data(CISA_URL)
-    if data and "vulnerabilities" in data:
-        for vulnerability in data["vulnerabilities"]:
-            vulnerability["cisa_status"] = "Yes"
-            vulnerability["ransomware_use"] = vulnerability.get(
-                "knownRansomwareCampaignUse", "Unknown"
-            )
-    return data, error
+    return fetch_feed_index("cisa_kev", CISA_URL, build_cisa_index)
 
 
 def fetch_nuclei_data(cve_id):
-    response = fetch_data(NUCLEI_URL)
-    if isinstance(response, str):
-        return None, response
-    try:
-        for line in response.iter_lines():
-            if line:
-                template = json.loads(line.decode("utf-8"))
-                if template["ID"] == cve_id:
-                    return template, None
-    except json.JSONDecodeError as e:
-        return None, f"❌ Error parsing JSON data from {NUCLEI_URL}: {e}"
-    return None, None
+    index, error = fetch_feed_index("nuclei_cves", NUCLEI_URL, build_nuclei_index)
+    if error:
+        return None, error
+    return index.get(cve_id), None
 
 
 def fetch_vulncheck_data(cve_id):
@@ -322,21 +1914,10 @@ def fetch_vulncheck_data(cve_id):
 
 
 def fetch_exploitdb_data(cve_id):
-    response = fetch_data(EXPLOITDB_URL)
-    if isinstance(response, str):
-        return [], response
-    try:
-        decoded_content = response.content.decode("utf-8")
-        csv_reader = csv.reader(decoded_content.splitlines(), delimiter=",")
-        header = next(csv_reader)
-        codes_index = header.index("codes")
-        return [
-            {"id": row[0], "date": row[3]}
-            for row in csv_reader
-            if cve_id in row[codes_index].split(";")
-        ], None
-    except csv.Error as e:
-        return [], f"❌ Error parsing CSV data from {EXPLOITDB_URL}: {e}"
+    index, error = fetch_feed_index("exploitdb", EXPLOITDB_URL, build_exploitdb_index)
+    if error:
+        return [], error
+    return list(index.get(cve_id, [])), None
 
 
 def fetch_packetstorm_data(cve_id):
@@ -351,6 +1932,8 @@ def fetch_packetstorm_data(cve_id):
 
 
 def fetch_hackerone_cve_details(cve_id):
+    import requests
+
     headers = {"content-type": "application/json"}
     payload = {
         "operationName": "CveDiscoveryDetailedViewCveEntry",
@@ -372,7 +1955,11 @@ def fetch_hackerone_cve_details(cve_id):
         """,
     }
 
-    response = requests.post(HACKERONE_URL, headers=headers, json=payload)
+    try:
+        response = send_request(
+            "POST", HACKERONE_URL, headers=headers, json=payload)
+    except requests.exceptions.RequestException as e:
+        return None, f"❌ Error fetching data from HackerOne: {e}"
     if response.status_code == 200:
         try:
             data = response.json()
@@ -455,18 +2042,14 @@ def display_epss_score(epss_data, error=None):
 
 def display_cisa_status(cve_id, cisa_data, error=None):
     def template(data):
-        if not data or "vulnerabilities" not in data or not data["vulnerabilities"]:
+        vulnerability = data.get(cve_id)
+        if not vulnerability:
             return ["└ ❌ No data found."]
 
-        for vulnerability in data["vulnerabilities"]:
-            if vulnerability["cveID"] == cve_id:
-                cisa_status = vulnerability["cisa_status"]
-                ransomware_use = vulnerability["ransomware_use"]
-                return [
-                    f"├ Listed:      {cisa_status}",
-                    f"└ Ransomware:  {ransomware_use}",
-                ]
-        return ["└ ❌ No data found."]
+        return [
+            f"├ Listed:      {vulnerability['cisa_status']}",
+            f"└ Ransomware:  {vulnerability['ransomware_use']}",
+        ]
 
     display_data("🛡️ CISA KEV Catalog", cisa_data, template, error)
 
@@ -633,12 +2216,7 @@ def calculate_priority(
     except (KeyError, IndexError, TypeError, ValueError):
         pass
 
-    in_cisa_kev = (
-        any(vuln["cveID"] == cve_id for vuln in cisa_data.get(
-            "vulnerabilities", []))
-        if cisa_data
-        else False
-    )
+    in_cisa_kev = bool(cisa_data) and cisa_data.get("cisa_status") == "Yes"
 
     has_public_exploits = False
     if github_data:
@@ -689,7 +2267,23 @@ def load_config(config_path=None, debug=False):
 
     default_config = {
         "vulncheck_api_key": None,
-        "openai_api_key": None
+        "openai_api_key": None,
+        "feed_cache_ttl": FEED_CACHE_TTL,
+        "http_timeout": list(HTTP_TIMEOUT),
+        "http_max_retries": HTTP_MAX_RETRIES,
+        "epss_source": "api",
+        "offline_max_age": OFFLINE_MAX_AGE,
+        "local_database_clone_mode": "full",
+        "ai_cache_ttl": AI_CACHE_TTL,
+        "ai_token_budget": AI_TOKEN_BUDGET,
+        "ai_streaming": True,
+        "ai_workers": AI_WORKERS,
+        "ai_batch_size": 0,
+        "ai_failover": [],
+        "ai_hedge_after": 0,
+        "ai_rate_limits": AI_RATE_LIMITS,
+        "epss_batch_size": EPSS_BATCH_SIZE,
+        "rate_limits": dict(RATE_LIMITS)
     }
 
     def debug_print(msg):
@@ -735,34 +2329,80 @@ def load_config(config_path=None, debug=False):
     return default_config
 
 
-def get_openai_risk_assessment(prompt):
+def read_streamed_completion(response, stream_callback):
+    parts = []
+    for chunk in response:
+        text = chunk.choices[0].delta.content if chunk.choices else None
+        if text:
+            parts.append(text)
+            stream_callback(text)
+    return "".join(parts).strip()
+
+
+def get_ai_client(ai_provider):
+    """
+    Returns the long-lived client for an AI provider so its connection pool is
+    reused across assessments. A new client is built only if the API key changes.
+    """
+    api_key = config.get(AI_API_KEY_SETTINGS[ai_provider])
+    with _ai_clients_lock:
+        cached = _ai_clients.get(ai_provider)
+        if cached and cached[0] == api_key:
+            return cached[1]
+        if ai_provider == "google":
+            from google import genai
+            client = genai.Client(api_key=api_key)
+        else:
+            from openai import OpenAI
+            client = OpenAI(api_key=api_key, base_url=AI_BASE_URLS.get(ai_provider))
+        _ai_clients[ai_provider] = (api_key, client)
+        return client
+
+
+def get_openai_risk_assessment(prompt, stream_callback=None):
     openai_api_key = config.get("openai_api_key")
     if not openai_api_key:
         return "❌ OpenAI API key is not configured correctly."
-    client = OpenAI(api_key=openai_api_key)
     try:
+        client = get_ai_client("openai")
         response = client.chat.completions.create(
-            model="gpt-4o",
+            model=AI_MODELS["openai"],
             messages=[
                 {"role": "system", "content": "You are a security analyst."},
                 {"role": "user", "content": prompt}
             ],
-            timeout=30
+            timeout=30,
+            stream=stream_callback is not None
         )
+        if stream_callback:
+            return read_streamed_completion(response, stream_callback)
         return response.choices[0].message.content.strip()
     except Exception as e:
         return f"❌ Error fetching data from OpenAI: {e}"
 
 
-def get_google_risk_assessment(prompt):
+def get_google_risk_assessment(prompt, stream_callback=None):
     google_api_key = config.get("google_ai_api_key")
     if not google_api_key:
         return "❌ Google AI API key is not configured correctly."
-    client = genai.Client(api_key=google_api_key)
+    try:
+        client = get_ai_client("google")
+    except ImportError as e:
+        return f"❌ Error fetching data from Google AI: {e}"
     for attempt in range(3):
+        parts = []
         try:
+            if stream_callback:
+                for chunk in client.models.generate_content_stream(
+                    model=AI_MODELS["google"],
+                    contents=[prompt]
+                ):
+                    if getattr(chunk, "text", None):
+                        parts.append(chunk.text)
+                        stream_callback(chunk.text)
+                return "".join(parts).strip() or "Google AI: AI analysis failed."
             response = client.models.generate_content(
-                model="gemini-2.0-flash",
+                model=AI_MODELS["google"],
                 contents=[prompt]
             )
             if hasattr(response, "text"):
@@ -770,7 +2410,8 @@ def get_google_risk_assessment(prompt):
             else:
                 return "Google AI: AI analysis failed."
         except Exception as e:
-            if attempt < 2:
+            # A retry after partial streamed output would repeat text already shown.
+            if attempt < 2 and not parts:
                 print(
                     f"⚠️ Google AI Timeout (Attempt {attempt+1}/3), retrying...")
                 time.sleep(5)
@@ -778,23 +2419,23 @@ def get_google_risk_assessment(prompt):
                 return f"❌ Error fetching data from Google AI: {e}"
 
 
-def get_grok_risk_assessment(prompt):
+def get_grok_risk_assessment(prompt, stream_callback=None):
     grok_api_key = config.get("grok_api_key")
     if not grok_api_key:
         return "❌ Grok AI API key is not configured correctly."
     try:
-        client = OpenAI(
-            api_key=grok_api_key,
-            base_url="https://api.x.ai/v1",
-        )
+        client = get_ai_client("grok")
         response = client.chat.completions.create(
-            model="grok-2-latest",
+            model=AI_MODELS["grok"],
             messages=[
                 {"role": "system", "content": "You are a security analyst."},
                 {"role": "user", "content": prompt}
             ],
-            timeout=30
+            timeout=30,
+            stream=stream_callback is not None
         )
+        if stream_callback:
+            return read_streamed_completion(response, stream_callback) or "Grok AI: No response received."
         if response.choices and len(response.choices) > 0:
             message = response.choices[0].message
             if hasattr(message, "content"):
@@ -807,22 +2448,23 @@ def get_grok_risk_assessment(prompt):
         return f"❌ Error fetching data from Grok AI: {e}"
 
 
-def get_deepseek_risk_assessment(prompt):
+def get_deepseek_risk_assessment(prompt, stream_callback=None):
     deepseek_api_key = config.get("deepseek_api_key")
     if not deepseek_api_key:
         return "❌ DeepSeek API key is not configured correctly."
     try:
-        client = OpenAI(api_key=deepseek_api_key,
-                        base_url="https://api.deepseek.com")
+        client = get_ai_client("deepseek")
         response = client.chat.completions.create(
-            model="deepseek-chat",
+            model=AI_MODELS["deepseek"],
             messages=[
                 {"role": "system", "content": "You are a security analyst."},
                 {"role": "user", "content": prompt}
             ],
             timeout=30,
-            stream=False
+            stream=stream_callback is not None
         )
+        if stream_callback:
+            return read_streamed_completion(response, stream_callback) or "DeepSeek: No response received."
         if response.choices and len(response.choices) > 0:
             message = response.choices[0].message
             if hasattr(message, "content"):
@@ -835,8 +2477,7 @@ def get_deepseek_risk_assessment(prompt):
         return f"❌ Error fetching data from DeepSeek: {e}"
 
 
-def generate_ai_prompt(cve_details, cve_data):
-    prompt = f"""
+AI_PROMPT_INSTRUCTIONS = """
 You are a security analyst. Provide exactly four sections of output, labeled with numeric headers:
 1. Risk Assessment
 Provide a detailed risk assessment including the nature of the vulnerability & its business impact.
@@ -856,31 +2497,423 @@ IMPORTANT:
 - Each heading must be on its own line.
 - If text spans multiple paragraphs, separate them by a blank line.
 - No other decorative characters or lists.
+"""
+
+# Reference tags that are most useful for mitigation advice, in order of preference.
+AI_REFERENCE_TAGS = ("patch", "vendor-advisory", "mitigation", "exploit", "third-party-advisory")
+
+# (max references, max affected products, max versions per product) tried in turn until the prompt fits.
+AI_PROMPT_REDUCTIONS = ((AI_MAX_REFERENCES, 20, 10), (5, 10, 3), (2, 5, 1), (0, 3, 1))
+
+
+def estimate_tokens(text):
+    return len(text) // 4 + 1
+
+
+def get_ai_token_budget(ai_provider):
+    budget = get_config_value("ai_token_budget", AI_TOKEN_BUDGET)
+    if isinstance(budget, dict):
+        return budget.get(ai_provider, AI_TOKEN_BUDGET)
+    return budget
+
+
+def build_compact_cve_context(cve_data, max_references=AI_MAX_REFERENCES, max_affected=20, max_versions=10):
+    """
+    Picks the parts of a CVE record that matter for a risk assessment and are
+    not already in the compile_cve_details summary: title, affected products,
+    problem types, all CVSS metrics (CNA and ADP) and the most useful references.
+    """
+    if not cve_data or "containers" not in cve_data:
+        return {}
+
+    cna = cve_data["containers"].get("cna", {})
+    containers = [cna] + cve_data["containers"].get("adp", [])
+    context = {"cveId": cve_data.get("cveMetadata", {}).get("cveId")}
+
+    if cna.get("title"):
+        context["title"] = cna["title"]
+
+    affected = []
+    for item in cna.get("affected", [])[:max_affected]:
+        entry = {
+            key: item[key]
+            for key in ("vendor", "product", "packageName", "defaultStatus", "cpes")
+            if item.get(key)
+        }
+        versions = [
+            {key: version[key] for key in ("version", "lessThan", "lessThanOrEqual", "status")
+             if version.get(key)}
+            for version in item.get("versions", [])[:max_versions]
+        ]
+        if versions:
+            entry["versions"] = versions
+        affected.append(entry)
+    if affected:
+        context["affected"] = affected
+
+    problem_types = []
+    for container in containers:
+        for problem_type in container.get("problemTypes", []):
+            for description in problem_type.get("descriptions", []):
+                text = description.get("description") or description.get("cweId")
+                if text and text not in problem_types:
+                    problem_types.append(text)
+    if problem_types:
+        context["problemTypes"] = problem_types
+
+    metrics = []
+    for container in containers:
+        for metric in container.get("metrics", []):
+            for key, value in metric.items():
+                if key.startswith("cvss") and isinstance(value, dict):
+                    metrics.append({
+                        "version": key,
+                        "baseScore": value.get("baseScore"),
+                        "baseSeverity": value.get("baseSeverity"),
+                        "vectorString": value.get("vectorString"),
+                    })
+    if metrics:
+        context["metrics"] = metrics
+
+    def reference_rank(reference):
+        tags = reference.get("tags", [])
+        return min((AI_REFERENCE_TAGS.index(tag) for tag in tags if tag in AI_REFERENCE_TAGS),
+                   default=len(AI_REFERENCE_TAGS))
+
+    references = sorted(cna.get("references", []), key=reference_rank)[:max_references]
+    if references:
+        context["references"] = [
+            {"url": ref["url"], "tags": ref["tags"]} if ref.get("tags") else {"url": ref["url"]}
+            for ref in references
+        ]
+    return context
+
+
+def generate_ai_prompt(cve_details, cve_data, ai_provider=None):
+    """
+    Builds the assessment prompt from the CVE summary and a minified selection
+    of the CVE record, dropping references and version ranges (and finally
+    truncating the summary) until it fits the provider's `ai_token_budget`.
+    """
+    def render(details, context):
+        return (f"{AI_PROMPT_INSTRUCTIONS}\nCVE DETAILS:\n{details}\n\n"
+                f"CVE DATA:\n{json.dumps(context, separators=(',', ':'))}\n")
+
+    budget = get_ai_token_budget(ai_provider)
+    for reduction in AI_PROMPT_REDUCTIONS:
+        context = build_compact_cve_context(cve_data, *reduction)
+        prompt = render(cve_details, context)
+        if estimate_tokens(prompt) <= budget:
+            break
+    else:
+        available = budget * 4 - len(render("", context))
+        prompt = render(cve_details[:max(0, available - 20)] + " [truncated]", context)
+
+    debug_print(
+        f"AI prompt for {ai_provider}: {len(prompt)} characters, "
+        f"~{estimate_tokens(prompt)} tokens (budget {budget}).")
+    return prompt
 
-CVE DETAILS:
-{cve_details}
 
-FULL CVE DATA:
-{json.dumps(cve_data, indent=4)}
+AI_BATCH_INSTRUCTIONS = """
+You will assess several CVEs at once. For each CVE, output a line containing only "### " followed by its CVE ID,
+then the four numbered sections above for that CVE only. Cover every CVE listed below in the same order and
+output nothing before the first "### " line.
 """
+
+
+def render_ai_batch_block(cve_id, cve_details, cve_data, reduction):
+    context = build_compact_cve_context(cve_data, *reduction)
+    return (f"\n=== {cve_id} ===\nCVE DETAILS:\n{cve_details}\n\n"
+            f"CVE DATA:\n{json.dumps(context, separators=(',', ':'))}\n")
+
+
+def pack_ai_batches(entries, ai_provider, batch_size):
+    """
+    Groups (cve_id, cve_details, cve_data, ...) entries into batches of at most
+    `batch_size` whose estimated prompt stays within the provider's budget.
+    """
+    budget = get_ai_token_budget(ai_provider)
+    header_tokens = estimate_tokens(AI_PROMPT_INSTRUCTIONS + AI_BATCH_INSTRUCTIONS)
+    batches, current, used = [], [], header_tokens
+    for entry in entries:
+        cost = estimate_tokens(render_ai_batch_block(
+            entry[0], entry[1], entry[2], AI_PROMPT_REDUCTIONS[1]))
+        if current and (len(current) >= batch_size or used + cost > budget):
+            batches.append(current)
+            current, used = [], header_tokens
+        current.append(entry)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def generate_batch_ai_prompt(entries, ai_provider=None):
+    budget = get_ai_token_budget(ai_provider)
+    header = AI_PROMPT_INSTRUCTIONS + AI_BATCH_INSTRUCTIONS
+    share = max(1, (budget - estimate_tokens(header)) // len(entries))
+    blocks = []
+    for cve_id, cve_details, cve_data, *_ in entries:
+        for reduction in AI_PROMPT_REDUCTIONS:
+            block = render_ai_batch_block(cve_id, cve_details, cve_data, reduction)
+            if estimate_tokens(block) <= share:
+                break
+        blocks.append(block)
+    prompt = header + "".join(blocks)
+    debug_print(
+        f"AI batch prompt for {ai_provider}: {len(entries)} CVE(s), "
+        f"~{estimate_tokens(prompt)} tokens (budget {budget}).")
     return prompt
 
 
-def get_risk_assessment(ai_provider, cve_details, cve_data):
-    prompt = generate_ai_prompt(cve_details, cve_data)
+def split_batch_assessment(assessment, cve_ids):
+    """
+    Splits a batched answer on its "### CVE-ID" lines. Only parts for the
+    requested CVEs that contain all four numbered sections are returned.
+    """
+    parts = re.split(r"^\s*#{1,6}\s*(CVE-\d{4}-\d{4,7})\s*:?\s*$",
+                     assessment or "", flags=re.MULTILINE | re.IGNORECASE)
+    assessments = {}
+    for cve_id, body in zip(parts[1::2], parts[2::2]):
+        cve_id, body = cve_id.upper(), body.strip()
+        if cve_id in cve_ids and all(
+            re.search(rf"^{number}\. ", body, re.MULTILINE) for number in "1234"
+        ):
+            assessments[cve_id] = body
+    return assessments
+
+
+def request_batch_risk_assessment(ai_provider, entries):
+    prompt = generate_batch_ai_prompt(entries, ai_provider)
+    assessment = request_ai_assessment(
+        ai_provider, prompt, AI_EXPECTED_OUTPUT_TOKENS * len(entries))
+    return split_batch_assessment(assessment, [entry[0] for entry in entries])
+
+
+class AiRateBudget:
+    """
+    Sliding one-minute window of requests and estimated tokens for one AI
+    provider. acquire() blocks until a request of the given size fits.
+    """
+
+    def __init__(self, rpm, tpm):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.requests = collections.deque()
+        self.lock = threading.Lock()
+
+    def acquire(self, tokens):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                while self.requests and now - self.requests[0][0] >= 60:
+                    self.requests.popleft()
+                used_tokens = sum(count for _, count in self.requests)
+                within_rpm = not self.rpm or len(self.requests) < self.rpm
+                # A single request larger than the whole budget may still run on its own.
+                within_tpm = not self.tpm or not self.requests or used_tokens + tokens <= self.tpm
+                if within_rpm and within_tpm:
+                    self.requests.append((now, tokens))
+                    return
+                wait = 60 - (now - self.requests[0][0])
+            time.sleep(max(wait, 0.05))
+
+
+def get_ai_rate_budget(ai_provider):
+    limits = {**AI_RATE_LIMITS.get(ai_provider, {}),
+              **get_config_value("ai_rate_limits", {}).get(ai_provider, {})}
+    with _ai_rate_budgets_lock:
+        if ai_provider not in _ai_rate_budgets:
+            _ai_rate_budgets[ai_provider] = AiRateBudget(
+                limits.get("rpm"), limits.get("tpm"))
+        return _ai_rate_budgets[ai_provider]
+
+
+def get_ai_cache_path(ai_provider, prompt):
+    model = AI_MODELS.get(ai_provider, "")
+    key = hashlib.sha256(
+        f"{ai_provider}\0{model}\0{prompt}".encode("utf-8")).hexdigest()
+    return os.path.join(get_sploitscan_dir(), "cache", "ai", f"{key}.json")
+
+
+def load_cached_risk_assessment(ai_provider, prompt):
+    try:
+        with open(get_ai_cache_path(ai_provider, prompt), "r", encoding="utf-8") as file:
+            entry = json.load(file)
+    except (OSError, json.JSONDecodeError):
+        return None
+    ttl = get_config_value("ai_cache_ttl", AI_CACHE_TTL)
+    if time.time() - entry.get("created_at", 0) >= ttl:
+        return None
+    return entry.get("assessment")
+
+
+def save_cached_risk_assessment(ai_provider, prompt, assessment):
+    if not assessment or assessment.startswith(AI_FAILURE_PREFIXES):
+        return
+    entry = {
+        "provider": ai_provider,
+        "model": AI_MODELS.get(ai_provider),
+        "created_at": time.time(),
+        "assessment": assessment,
+    }
+    try:
+        write_file_atomic(get_ai_cache_path(ai_provider, prompt), json.dumps(entry))
+    except OSError as e:
+        print(f"⚠️ Could not write AI assessment cache: {e}")
+
+
+def request_risk_assessment(ai_provider, prompt, stream_callback=None):
+    if offline_enabled:
+        return "❌ AI risk assessment is not available in offline mode."
     if ai_provider == "openai":
-        return get_openai_risk_assessment(prompt)
+        return get_openai_risk_assessment(prompt, stream_callback)
     elif ai_provider == "google":
-        return get_google_risk_assessment(prompt)
+        return get_google_risk_assessment(prompt, stream_callback)
     elif ai_provider == "grok":
-        return get_grok_risk_assessment(prompt)
+        return get_grok_risk_assessment(prompt, stream_callback)
     elif ai_provider == "deepseek":
-        return get_deepseek_risk_assessment(prompt)
+        return get_deepseek_risk_assessment(prompt, stream_callback)
     else:
         return "❌ Unknown AI provider selected."
 
 
-def display_ai_risk_assessment(cve_details, cve_data, ai_provider):
+def is_failed_assessment(assessment):
+    return not assessment or assessment.startswith(AI_FAILURE_PREFIXES)
+
+
+def request_with_rate_budget(ai_provider, prompt, output_tokens, stream_callback=None):
+    get_ai_rate_budget(ai_provider).acquire(estimate_tokens(prompt) + output_tokens)
+    return request_risk_assessment(ai_provider, prompt, stream_callback)
+
+
+def get_ai_failover_chain(ai_provider):
+    # Failover only extends a provider that was actually selected.
+    if ai_provider not in AI_API_KEY_SETTINGS:
+        return []
+    chain = [ai_provider]
+    for provider in get_config_value("ai_failover", []) or []:
+        if (provider not in chain and provider in AI_API_KEY_SETTINGS
+                and config.get(AI_API_KEY_SETTINGS[provider])):
+            chain.append(provider)
+    return chain
+
+
+def request_ai_assessment(ai_provider, prompt, output_tokens=AI_EXPECTED_OUTPUT_TOKENS,
+                          stream_callback=None):
+    """
+    Requests an assessment from `ai_provider`, moving on to the providers in
+    the "ai_failover" config list when it fails. With "ai_hedge_after" set,
+    the next provider is also asked once the current one has not answered
+    within that many seconds, and the first good answer wins; hedged requests
+    are not streamed, the winning text is handed to `stream_callback` at once.
+    """
+    chain = get_ai_failover_chain(ai_provider)
+    hedge_after = get_config_value("ai_hedge_after", 0)
+    if not chain:
+        return "❌ Unknown AI provider selected."
+    if len(chain) == 1:
+        return request_with_rate_budget(ai_provider, prompt, output_tokens, stream_callback)
+
+    if not hedge_after:
+        streamed = []
+
+        def on_stream_text(text):
+            streamed.append(text)
+            stream_callback(text)
+
+        for provider in chain:
+            assessment = request_with_rate_budget(
+                provider, prompt, output_tokens, on_stream_text if stream_callback else None)
+            # Text already shown cannot be taken back, so stop after a partial stream.
+            if not is_failed_assessment(assessment) or streamed:
+                return assessment
+            debug_print(f"AI provider {provider} failed, failing over: {assessment}")
+        return assessment
+
+    remaining = list(chain)
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(chain))
+    pending = {}
+    assessment = None
+    try:
+        while remaining or pending:
+            if remaining and not pending:
+                provider = remaining.pop(0)
+                pending[executor.submit(
+                    request_with_rate_budget, provider, prompt, output_tokens)] = provider
+            done, _ = concurrent.futures.wait(
+                pending, timeout=hedge_after if remaining else None,
+                return_when=concurrent.futures.FIRST_COMPLETED)
+            if not done:
+                provider = remaining.pop(0)
+                debug_print(f"AI provider(s) {', '.join(pending.values())} slower than "
+                            f"{hedge_after}s, hedging with {provider}.")
+                pending[executor.submit(
+                    request_with_rate_budget, provider, prompt, output_tokens)] = provider
+                continue
+            for future in done:
+                provider = pending.pop(future)
+                try:
+                    assessment = future.result()
+                except Exception as e:
+                    assessment = f"❌ Error fetching data from {provider}: {e}"
+                if not is_failed_assessment(assessment):
+                    debug_print(f"AI assessment answered by {provider}.")
+                    if stream_callback:
+                        stream_callback(assessment)
+                    return assessment
+                debug_print(f"AI provider {provider} failed, failing over: {assessment}")
+        return assessment
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def get_risk_assessment(ai_provider, cve_details, cve_data, stream_callback=None):
+    """
+    Returns the assessment for a CVE, answering from the on-disk cache in
+    ~/.sploitscan/cache/ai when the same provider, model and prompt were seen
+    within `ai_cache_ttl` seconds. Failed responses are never cached.
+    If `stream_callback` is given, it receives the text as it arrives.
+    """
+    prompt = generate_ai_prompt(cve_details, cve_data, ai_provider)
+    assessment = load_cached_risk_assessment(ai_provider, prompt)
+    if assessment is not None:
+        if stream_callback:
+            stream_callback(assessment)
+        return assessment
+    assessment = request_ai_assessment(
+        ai_provider, prompt, stream_callback=stream_callback)
+    save_cached_risk_assessment(ai_provider, prompt, assessment)
+    return assessment
+
+
+def format_ai_section(section):
+    section = section.strip()
+    if not section:
+        return []
+    if section.startswith(("1. ", "2. ", "3. ", "4. ")):
+        header = section.split("\n")[0].strip()
+        content = "\n".join(section.split("\n")[1:]).strip()
+        lines = [f"| {header}", "| " + "-" * (len(header) + 1)]
+        lines.append(textwrap.fill(
+            content, width=100, initial_indent="| ", subsequent_indent="| "
+        ))
+    else:
+        lines = [textwrap.fill(
+            section, width=100, initial_indent="| ", subsequent_indent="| "
+        )]
+    lines.append("|")
+    return lines
+
+
+def display_ai_risk_assessment(cve_details, cve_data, ai_provider, pending_assessment=None):
+    """
+    Shows the AI assessment for a CVE and returns it. If the assessment was
+    already scheduled, `pending_assessment` is its future and the spinner runs
+    until it completes. Otherwise, unless "ai_streaming" is disabled in the
+    config, each section is printed as soon as the provider has streamed it.
+    """
     def spinner_animation(message):
         spinner = itertools.cycle(["|", "/", "-", "\\"])
         while not stop_spinner:
@@ -890,22 +2923,46 @@ def display_ai_risk_assessment(cve_details, cve_data, ai_provider):
         sys.stdout.write("\r" + " " * (len(message) + 2) + "\r")
         sys.stdout.flush()
 
+    def stop_spinner_animation():
+        global stop_spinner
+        stop_spinner = True
+        spinner_thread.join()
+
+    def on_stream_text(text):
+        nonlocal buffer, first_output_at
+        if first_output_at is None:
+            first_output_at = time.monotonic()
+            stop_spinner_animation()
+            print("|")
+        buffer += text
+        *sections, buffer = buffer.split("\n\n")
+        for section in sections:
+            for line in format_ai_section(section):
+                print(line)
+        sys.stdout.flush()
+
     def get_risk_assessment_thread():
         nonlocal assessment
         try:
+            if pending_assessment is not None:
+                assessment = pending_assessment.result()
+                return
             assessment = get_risk_assessment(
-                ai_provider, cve_details, cve_data)
+                ai_provider, cve_details, cve_data,
+                on_stream_text if streaming else None)
         except Exception as e:
             assessment = f"❌ Error fetching AI response: {e}"
-        global stop_spinner
-        stop_spinner = True
 
     global stop_spinner
     stop_spinner = False
     assessment = None
+    streaming = get_config_value("ai_streaming", True)
+    buffer = ""
+    first_output_at = None
 
     print("┌───[ 🤖 AI-Powered Risk Assessment ]")
     print("|")
+    started_at = time.monotonic()
     spinner_thread = threading.Thread(
         target=spinner_animation,
         args=(f"| Loading {ai_provider} risk assessment...",)
@@ -914,37 +2971,39 @@ def display_ai_risk_assessment(cve_details, cve_data, ai_provider):
     assessment_thread = threading.Thread(target=get_risk_assessment_thread)
     assessment_thread.start()
     assessment_thread.join()
-    spinner_thread.join()
 
-    print("|")
-    if assessment:
-        sections = assessment.split("\n\n")
-        for section in sections:
-            section = section.strip()
-            if section:
-                if section.startswith(("1. ", "2. ", "3. ", "4. ")):
-                    header = section.split("\n")[0].strip()
-                    print(f"| {header}")
-                    print("| " + "-" * (len(header) + 1))
-                    content = "\n".join(section.split("\n")[1:]).strip()
-                    wrapped_content = textwrap.fill(
-                        content, width=100, initial_indent="| ", subsequent_indent="| "
-                    )
-                    print(wrapped_content)
-                else:
-                    wrapped_content = textwrap.fill(
-                        section, width=100, initial_indent="| ", subsequent_indent="| "
-                    )
-                    print(wrapped_content)
-                print("|")
+    if first_output_at is not None:
+        for line in format_ai_section(buffer):
+            print(line)
+        if assessment and assessment.startswith(AI_FAILURE_PREFIXES):
+            for line in format_ai_section(assessment):
+                print(line)
+        debug_print(
+            f"| AI first output after {first_output_at - started_at:.2f}s, "
+            f"complete after {time.monotonic() - started_at:.2f}s.")
     else:
-        print("| ❌ No AI Risk Assessment could be retrieved.")
+        stop_spinner_animation()
         print("|")
+        if assessment:
+            for section in assessment.split("\n\n"):
+                for line in format_ai_section(section):
+                    print(line)
+        else:
+            print("| ❌ No AI Risk Assessment could be retrieved.")
+            print("|")
+        debug_print(
+            f"| AI response complete after {time.monotonic() - started_at:.2f}s.")
 
     print("└────────────────────────────────────────\n")
+    return assessment
 
 
 def import_vulnerability_data(file_path, file_type=None):
+    """
+    Returns an iterator over the unique CVE IDs in a scanner report. Reports
+    are parsed incrementally, so the first CVEs can be enriched while the rest
+    of the file is still being read.
+    """
     if not os.path.exists(file_path):
         print(f"❌ Error: The file '{file_path}' does not exist.")
         return []
@@ -987,61 +3046,225 @@ def is_plaintext_cve_list(file_path):
 
 
 def parse_plaintext_cve_list(file):
-    return [line.strip().upper() for line in file if is_valid_cve_id(line.strip().upper())]
+    for line in file:
+        if is_valid_cve_id(line.strip().upper()):
+            yield line.strip().upper()
+
+
+def iter_xml_elements(file, tag):
+    """
+    Yields each `tag` element as soon as it has been parsed, then drops it
+    and any finished element outside it from the tree, so memory stays flat
+    however large the report is.
+    """
+    inside_tag = 0
+    open_elements = []
+    for event, elem in ET.iterparse(file, events=("start", "end")):
+        if event == "start":
+            open_elements.append(elem)
+            if elem.tag == tag:
+                inside_tag += 1
+            continue
+        open_elements.pop()
+        if elem.tag == tag:
+            inside_tag -= 1
+            yield elem
+        elif inside_tag:
+            continue
+        elem.clear()
+        if open_elements:
+            open_elements[-1].remove(elem)
 
 
 def parse_nessus_file(file):
-    tree = ET.parse(file)
-    root = tree.getroot()
-    return [
-        cve.text.strip().upper()
-        for report_item in root.findall(".//ReportItem")
-        for cve in report_item.findall("cve")
-        if is_valid_cve_id(cve.text.strip().upper())
-    ]
+    for report_item in iter_xml_elements(file, "ReportItem"):
+        for cve in report_item.findall("cve"):
+            if cve.text and is_valid_cve_id(cve.text.strip().upper()):
+                yield cve.text.strip().upper()
 
 
 def parse_nexpose_file(file):
-    tree = ET.parse(file)
-    root = tree.getroot()
-    return [
-        link.get("LinkTitle").upper()
-        for link in root.findall(".//URLLink")
-        if link.get("LinkTitle", "").startswith("CVE-")
-    ]
+    for link in iter_xml_elements(file, "URLLink"):
+        if link.get("LinkTitle", "").startswith("CVE-"):
+            yield link.get("LinkTitle").upper()
 
 
 def parse_openvas_file(file):
-    tree = ET.parse(file)
-    root = tree.getroot()
-    return [
-        ref.attrib.get("id").upper()
-        for ref in root.findall(".//ref[@type='cve']")
-        if is_valid_cve_id(ref.attrib.get("id").upper())
-    ]
+    for ref in iter_xml_elements(file, "ref"):
+        if ref.get("type") == "cve" and is_valid_cve_id(ref.get("id", "").upper()):
+            yield ref.get("id").upper()
+
+
+JSON_STREAM_CHUNK_SIZE = 1024 * 1024
+JSON_NUMBER_TAIL = re.compile(r"[0-9.eE+-]*")
+SARIF_RULES_PATH = ("runs", "*", "tool", "driver", "rules", "*")
+
+
+class JsonStreamReader:
+    """
+    Walks a JSON document in a text file one object key or array item at a
+    time. Values that are not descended into are decoded (or skipped) with
+    JSONDecoder.raw_decode, and the file is read in chunks as needed, so
+    invalid JSON still raises json.JSONDecodeError.
+    """
+
+    def __init__(self, file, chunk_size=JSON_STREAM_CHUNK_SIZE):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.decoder = json.JSONDecoder()
+
+    def fill(self):
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def error(self, message):
+        raise json.JSONDecodeError(message, self.buffer, self.pos)
+
+    def peek(self):
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char):
+        if self.peek() != char:
+            self.error(f"Expecting '{char}'")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # A number cut by the chunk boundary (after a digit, ".", "e" or a
+            # sign) decodes as a shorter one, so read on before accepting it.
+            if (isinstance(value, (int, float)) and not isinstance(value, bool)
+                    and JSON_NUMBER_TAIL.fullmatch(self.buffer, end) and self.fill()):
+                continue
+            self.pos = end
+            return value
+
+    def items(self):
+        """
+        Yields each key of the object at the cursor; the caller consumes its value.
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            if self.peek() != '"':
+                self.error("Expecting property name enclosed in double quotes")
+            key = self.value()
+            self.expect(":")
+            yield key
+            char = self.peek()
+            self.pos += 1
+            if char == "}":
+                return
+            if char != ",":
+                self.pos -= 1
+                self.error("Expecting ',' delimiter")
+
+    def elements(self):
+        """
+        Yields once per item of the array at the cursor; the caller consumes it.
+        """
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield
+            char = self.peek()
+            self.pos += 1
+            if char == "]":
+                return
+            if char != ",":
+                self.pos -= 1
+                self.error("Expecting ',' delimiter")
+
+    def skip(self):
+        char = self.peek()
+        if char == "{":
+            for _ in self.items():
+                self.skip()
+        elif char == "[":
+            for _ in self.elements():
+                self.skip()
+        else:
+            self.value()
+
+    def select(self, path):
+        """
+        Yields the decoded values at `path`, a tuple of object keys and "*" for
+        every item of an array. Anything off the path is skipped.
+        """
+        if not path:
+            yield self.value()
+            return
+        step, rest = path[0], path[1:]
+        char = self.peek()
+        if step == "*" and char == "[":
+            for _ in self.elements():
+                yield from self.select(rest)
+        elif step != "*" and char == "{":
+            for key in self.items():
+                if key == step:
+                    yield from self.select(rest)
+                else:
+                    self.skip()
+        else:
+            self.skip()
+
+    def end(self):
+        if self.peek():
+            self.error("Extra data")
+
+
+def iter_json_values(file, path):
+    """
+    Yields the values at `path` (see JsonStreamReader.select) of a JSON file
+    without loading the whole document, then checks the rest of it is valid.
+    """
+    reader = JsonStreamReader(file)
+    yield from reader.select(path)
+    reader.end()
 
 
 def parse_docker_file(file):
-    data = json.load(file)
-    return [
-        rule.get("id", "").upper()
-        for run in data.get("runs", [])
-        for rule in run.get("tool", {}).get("driver", {}).get("rules", [])
-        if rule.get("id", "").startswith("CVE-")
-    ]
+    for rule in iter_json_values(file, SARIF_RULES_PATH):
+        rule_id = rule.get("id", "") if isinstance(rule, dict) else ""
+        if rule_id.startswith("CVE-"):
+            yield rule_id.upper()
 
 
 def import_file(file_path, parse_function):
+    seen = set()
     try:
         with open(file_path, "r") as file:
-            cve_ids = parse_function(file)
-        unique_cve_ids = list(set(cve_ids))
+            for cve_id in parse_function(file):
+                if cve_id not in seen:
+                    seen.add(cve_id)
+                    yield cve_id
         print(
             YELLOW +
-            f"📥 Successfully imported {len(unique_cve_ids)} CVE(s) from '{
+            f"📥 Successfully imported {len(seen)} CVE(s) from '{
                 file_path}'.\n"
         )
-        return unique_cve_ids
     except ET.ParseError as e:
         print(f"❌ Error parsing the file '{file_path}': {e}")
     except json.JSONDecodeError as e:
@@ -1049,7 +3272,6 @@ def import_file(file_path, parse_function):
     except Exception as e:
         print(f"❌ An unexpected error occurred while processing '{
               file_path}': {e}")
-    return []
 
 
 def is_valid_cve_id(cve_id):
@@ -1069,6 +3291,8 @@ def datetimeformat(value, format="%Y-%m-%d"):
 
 def export_to_html(all_results, cve_ids):
     def template(data):
+        from jinja2 import Environment, FileSystemLoader
+
         base_path = os.path.dirname(os.path.abspath(__file__))
         template_paths = [
             os.path.join(base_path, "templates"),
@@ -1169,19 +3393,56 @@ def export_to_json(all_results, cve_ids):
     display_data("📁 JSON Export", all_results, template)
 
 
-def export_to_csv(all_results, cve_ids):
-    def template(data):
-        filename = generate_filename(cve_ids, "csv")
-        keys = list(data[0].keys()) + ["Risk Assessment"]
-        with open(filename, "w", newline="", encoding="utf-8") as file:
-            writer = csv.DictWriter(file, fieldnames=keys)
-            writer.writeheader()
-            for item in data:
-                item["Risk Assessment"] = item.get("Risk Assessment", "N/A")
-                writer.writerow(item)
-        return [f"└ Data exported to CSV: {filename}"]
+class IncrementalExporter:
+    """
+    Writes each CVE's export record as soon as it is complete and flushes it,
+    so an interrupted scan keeps every finished CVE. NDJSON records go to
+    `stream`; CSV rows go to a file named after the CVEs, opened on the
+    first record.
+    """
 
-    display_data("📁 CSV Export", all_results, template)
+    def __init__(self, export_format, cve_ids=None, stream=None):
+        self.export_format = export_format
+        self.cve_ids = cve_ids
+        self.stream = stream or sys.stdout
+        self.file = None
+        self.writer = None
+        self.filename = None
+        self.count = 0
+
+    def write(self, record):
+        if self.export_format == "ndjson":
+            self.stream.write(json.dumps(record, default=str) + "\n")
+            self.stream.flush()
+        else:
+            if self.writer is None:
+                self._open_csv(record)
+            row = dict(record)
+            row["Risk Assessment"] = row.get("Risk Assessment") or "N/A"
+            self.writer.writerow(row)
+            self.file.flush()
+        self.count += 1
+
+    def _open_csv(self, record):
+        first_cve_id = ((record.get("CVE Data") or {}).get("cveMetadata") or {}).get("cveId", "CVE")
+        self.filename = generate_filename(self.cve_ids or [first_cve_id], "csv")
+        keys = list(record.keys())
+        if "Risk Assessment" not in keys:
+            keys.append("Risk Assessment")
+        self.file = open(self.filename, "w", newline="", encoding="utf-8")
+        self.writer = csv.DictWriter(self.file, fieldnames=keys, extrasaction="ignore")
+        self.writer.writeheader()
+        self.file.flush()
+
+    def close(self):
+        if self.file:
+            self.file.close()
+        if self.export_format == "ndjson":
+            display_data("📁 NDJSON Export", self.count,
+                         lambda count: [f"└ {count} record(s) streamed to stdout"])
+        else:
+            display_data("📁 CSV Export", self.filename,
+                         lambda filename: [f"└ Data exported to CSV: {filename}"])
 
 
 def display_banner():
@@ -1205,58 +3466,166 @@ def print_cve_header(cve_id):
     print(f"{GREEN}╚{line}╝{ENDC}\n")
 
 
-def fetch_and_display_cve_data(cve_id):
-    cve_data, cve_error = fetch_github_cve_data(cve_id)
-    display_cve_data(cve_data, cve_error)
-    return cve_data
+def submit_cve_lookups(executor, cve_id, selected_methods, fast_mode, epss_batcher=None):
+    """
+    Schedules every source lookup for one CVE on the shared executor and
+    returns the futures keyed by source. Each future yields (data, error).
+    """
+    if fast_mode:
+        return {"cve": executor.submit(resolve_cve_record, cve_id)}
+
+    lookups = {
+        "cve": executor.submit(resolve_cve_record, cve_id),
+        "github": executor.submit(fetch_json_data, GITHUB_API_URL, params={"cve_id": cve_id}),
+        "vulncheck": executor.submit(fetch_vulncheck_data, cve_id),
+        "exploitdb": executor.submit(fetch_exploitdb_data, cve_id),
+        "packetstorm": executor.submit(fetch_packetstorm_data, cve_id),
+        "nuclei": executor.submit(fetch_nuclei_data, cve_id),
+    }
+    if "epss" in selected_methods:
+        lookups["epss"] = (
+            epss_batcher.request(cve_id)
+            if epss_batcher
+            else executor.submit(fetch_epss_score, cve_id)
+        )
+    if "cisa" in selected_methods:
+        lookups["cisa"] = executor.submit(fetch_cisa_data)
+    if "hackerone" in selected_methods:
+        lookups["hackerone"] = executor.submit(fetch_hackerone_cve_details, cve_id)
+    return lookups
 
 
-def fetch_and_display_epss_score(cve_id):
-    epss_data, epss_error = fetch_epss_score(cve_id)
-    display_epss_score(epss_data, epss_error)
-    return epss_data
+def collect_public_exploits(lookups):
+    vulncheck_data, _ = lookups["vulncheck"].result()
+    return {
+        "github_data": lookups["github"].result()[0],
+        "vulncheck_data": vulncheck_data if isinstance(vulncheck_data, dict) else {},
+        "exploitdb_data": lookups["exploitdb"].result()[0],
+        "packetstorm_data": lookups["packetstorm"].result()[0],
+        "nuclei_data": lookups["nuclei"].result()[0],
+    }
 
 
-def fetch_and_display_cisa_status(cve_id):
-    cisa_data, cisa_error = fetch_cisa_data()
-    display_cisa_status(cve_id, cisa_data, cisa_error)
-    relevant_cisa_data = next(
-        (item for item in cisa_data.get(
-            "vulnerabilities", []) if item["cveID"] == cve_id),
-        None,
+def display_public_exploit_lookups(lookups):
+    public_exploits = collect_public_exploits(lookups)
+    _, vulncheck_error = lookups["vulncheck"].result()
+    display_public_exploits(
+        public_exploits["github_data"],
+        public_exploits["vulncheck_data"],
+        public_exploits["exploitdb_data"],
+        public_exploits["packetstorm_data"],
+        public_exploits["nuclei_data"],
+        vulncheck_error,
     )
+    return public_exploits
+
+
+def collect_cisa_data(cve_id, lookups):
+    cisa_index, _ = lookups["cisa"].result()
+    relevant_cisa_data = cisa_index.get(cve_id) if cisa_index else None
     return relevant_cisa_data if relevant_cisa_data else {"cisa_status": "N/A", "ransomware_use": "N/A"}
 
 
-def fetch_and_display_public_exploits(cve_id):
-    github_data, github_error = fetch_json_data(
-        GITHUB_API_URL, params={"cve_id": cve_id})
-    vulncheck_data, vulncheck_error = fetch_vulncheck_data(cve_id)
-    exploitdb_data, exploitdb_error = fetch_exploitdb_data(cve_id)
-    packetstorm_data, packetstorm_error = fetch_packetstorm_data(cve_id)
-    nuclei_data, nuclei_error = fetch_nuclei_data(cve_id)
+def display_cisa_lookup(cve_id, lookups):
+    cisa_index, cisa_error = lookups["cisa"].result()
+    display_cisa_status(cve_id, cisa_index, cisa_error)
+    return collect_cisa_data(cve_id, lookups)
 
-    display_public_exploits(
-        github_data,
-        vulncheck_data,
-        exploitdb_data,
-        packetstorm_data,
-        nuclei_data,
-        vulncheck_error,
-    )
-    return {
-        "github_data": github_data,
-        "vulncheck_data": vulncheck_data if isinstance(vulncheck_data, dict) else {},
-        "exploitdb_data": exploitdb_data,
-        "packetstorm_data": packetstorm_data,
-        "nuclei_data": nuclei_data,
-    }
+
+def compile_cve_lookup_details(cve_id, lookups):
+    """
+    Waits for one CVE's lookups and compiles the same details the display
+    step passes to the AI. Returns (cve_details, cve_data), or (None, None)
+    when there is no CVE record.
+    """
+    cve_data, _ = lookups["cve"].result()
+    if not cve_data:
+        return None, None
+    epss_data = lookups["epss"].result()[0] if "epss" in lookups else None
+    relevant_cisa_data = collect_cisa_data(cve_id, lookups) if "cisa" in lookups else None
+    cve_details = compile_cve_details(
+        cve_id, cve_data, epss_data, relevant_cisa_data, collect_public_exploits(lookups))
+    return cve_details, cve_data
+
+
+def assess_cve_lookups(cve_id, lookups, ai_provider):
+    cve_details, cve_data = compile_cve_lookup_details(cve_id, lookups)
+    if not cve_data:
+        return None
+    return get_risk_assessment(ai_provider, cve_details, cve_data)
+
+
+class AiBatcher:
+    """
+    Opt-in batched AI mode: collects CVEs in input order and assesses up to
+    `batch_size` of them per request (fewer if the token budget is reached).
+    Each CVE still gets its own future, cache entry and four-section answer;
+    CVEs missing from a batched answer are retried on their own.
+    """
+
+    def __init__(self, executor, ai_provider, batch_size):
+        self.executor = executor
+        self.ai_provider = ai_provider
+        self.batch_size = batch_size
+        self.queued = []
+        self.lock = threading.Lock()
+
+    def request(self, cve_id, lookups):
+        future = concurrent.futures.Future()
+        with self.lock:
+            self.queued.append((cve_id, lookups, future))
+            if len(self.queued) >= self.batch_size:
+                self._dispatch()
+        return future
+
+    def ensure_dispatched(self, cve_id):
+        with self.lock:
+            if any(queued_id == cve_id for queued_id, _, _ in self.queued):
+                self._dispatch()
+
+    def flush(self):
+        with self.lock:
+            if self.queued:
+                self._dispatch()
+
+    def _dispatch(self):
+        batch, self.queued = self.queued, []
+        self.executor.submit(self._assess_batch, batch)
+
+    def _assess_batch(self, batch):
+        try:
+            entries = []
+            for cve_id, lookups, future in batch:
+                cve_details, cve_data = compile_cve_lookup_details(cve_id, lookups)
+                if not cve_data:
+                    future.set_result(None)
+                    continue
+                prompt = generate_ai_prompt(cve_details, cve_data, self.ai_provider)
+                assessment = load_cached_risk_assessment(self.ai_provider, prompt)
+                if assessment is not None:
+                    future.set_result(assessment)
+                    continue
+                entries.append((cve_id, cve_details, cve_data, prompt, future))
+
+            for group in pack_ai_batches(entries, self.ai_provider, self.batch_size):
+                assessments = request_batch_risk_assessment(self.ai_provider, group)
+                for cve_id, cve_details, cve_data, prompt, future in group:
+                    assessment = assessments.get(cve_id)
+                    if assessment is None:
+                        assessment = get_risk_assessment(self.ai_provider, cve_details, cve_data)
+                    else:
+                        save_cached_risk_assessment(self.ai_provider, prompt, assessment)
+                    future.set_result(assessment)
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
 
 
-def fetch_and_display_hackerone_data(cve_id):
-    hackerone_data, hackerone_error = fetch_hackerone_cve_details(cve_id)
-    display_hackerone_data(hackerone_data, hackerone_error)
-    return hackerone_data
+def display_lookup(lookups, name, display_function):
+    data, error = lookups[name].result()
+    display_function(data, error)
+    return data
 
 
 def compile_cve_details(cve_id, cve_data, epss_data, relevant_cisa_data, public_exploits):
@@ -1349,132 +3718,295 @@ def compile_cve_details(cve_id, cve_data, epss_data, relevant_cisa_data, public_
     """
 
 
-def main(cve_ids, export_format=None, import_file=None, import_type=None, ai_provider=None,
-         config_path=None, methods=None, debug=False, fast_mode=False):
-    global config
-    config = load_config(config_path=config_path,
-                         debug=debug) if config_path else load_config(debug=debug)
+def display_cve_lookups(cve_id, lookups, selected_methods, ai_provider, fast_mode):
+    """
+    Prints the block for one CVE from its completed lookups, in the same order
+    the sources were always shown, and returns the CVE's export record.
+    """
+    if lookups is None:
+        print(
+            f"❌ Invalid CVE ID format: {cve_id}. Please use the format CVE-YYYY-NNNNN.")
+        return None
 
-    all_results = []
-    if export_format:
-        export_format = export_format.lower()
+    print_cve_header(cve_id)
 
-    if import_file:
-        cve_ids = import_vulnerability_data(import_file, import_type)
-        if not cve_ids:
-            print("❌ No valid CVE IDs found in the provided file.")
-            return
+    cve_data, cve_error = lookups["cve"].result()
+    display_cve_data(cve_data, cve_error)
 
-    if not cve_ids:
-        print("❌ No CVE IDs provided. Please provide CVE IDs or an import file.")
-        return
+    if fast_mode:
+        return {
+            "CVE Data": cve_data,
+            "EPSS Data": None,
+            "CISA Data": {"cisa_status": "N/A", "ransomware_use": "N/A"},
+            "Nuclei Data": None,
+            "GitHub Data": None,
+            "VulnCheck Data": None,
+            "ExploitDB Data": None,
+            "PacketStorm Data": None,
+            "HackerOne Data": None,
+            "Priority": {"Priority": 0},
+            "Risk Assessment": None,
+        }
 
-    default_methods = ["cisa", "epss", "hackerone", "ai", "prio", "references"]
-    selected_methods = methods.split(",") if methods else default_methods
+    if not cve_data:
+        return None
 
-    for cve_id in cve_ids:
-        cve_id = cve_id.upper()
-        if not is_valid_cve_id(cve_id):
-            print(
-                f"❌ Invalid CVE ID format: {cve_id}. Please use the format CVE-YYYY-NNNNN.")
-            continue
+    public_exploits = display_public_exploit_lookups(lookups)
+    epss_data = display_lookup(
+        lookups, "epss", display_epss_score) if "epss" in selected_methods else None
+    relevant_cisa_data = display_cisa_lookup(
+        cve_id, lookups) if "cisa" in selected_methods else None
+    hackerone_data = display_lookup(
+        lookups, "hackerone", display_hackerone_data) if "hackerone" in selected_methods else None
+
+    risk_assessment = None
+    if "ai" in selected_methods:
+        cve_details = compile_cve_details(
+            cve_id, cve_data, epss_data, relevant_cisa_data, public_exploits)
+        risk_assessment = display_ai_risk_assessment(
+            cve_details, cve_data, ai_provider, lookups.get("ai"))
+
+    priority = None
+    if "prio" in selected_methods:
+        priority = calculate_priority(
+            cve_id,
+            cve_data,
+            epss_data,
+            public_exploits.get("github_data"),
+            relevant_cisa_data,
+            public_exploits.get("vulncheck_data"),
+            public_exploits.get("exploitdb_data"),
+        )
+        display_priority_rating(cve_id, priority)
 
-        print_cve_header(cve_id)
+    if "references" in selected_methods:
+        display_cve_references(cve_data)
 
-        if fast_mode:
-            parts = cve_id.split('-')
-            year = parts[1]
-            hundreds = parts[2][:-3] + "xxx"
-            cve_path = os.path.join(
-                get_cve_local_dir(), year, hundreds, f"{cve_id}.json")
-            if os.path.exists(cve_path):
-                try:
-                    with open(cve_path, "r", encoding="utf-8") as file:
-                        cve_data = json.load(file)
-                    display_cve_data(cve_data)
-                except Exception as e:
-                    print(f"Error reading local CVE file {cve_path}: {e}")
-                    continue
-            else:
-                cve_data = fetch_and_display_cve_data(cve_id)
-        else:
-            cve_data = fetch_and_display_cve_data(cve_id)
-            if not cve_data:
-                continue
+    return {
+        "CVE Data": cve_data,
+        "EPSS Data": epss_data,
+        "CISA Data": relevant_cisa_data or {"cisa_status": "N/A", "ransomware_use": "N/A"},
+        "Nuclei Data": public_exploits.get("nuclei_data"),
+        "GitHub Data": public_exploits.get("github_data"),
+        "VulnCheck Data": public_exploits.get("vulncheck_data"),
+        "ExploitDB Data": public_exploits.get("exploitdb_data"),
+        "PacketStorm Data": public_exploits.get("packetstorm_data"),
+        "HackerOne Data": hackerone_data,
+        "Priority": {"Priority": priority},
+        "Risk Assessment": risk_assessment,
+    }
 
-            public_exploits = fetch_and_display_public_exploits(cve_id)
-            epss_data = fetch_and_display_epss_score(
-                cve_id) if "epss" in selected_methods else None
-            relevant_cisa_data = fetch_and_display_cisa_status(
-                cve_id) if "cisa" in selected_methods else None
-            hackerone_data = fetch_and_display_hackerone_data(
-                cve_id) if "hackerone" in selected_methods else None
-
-            risk_assessment = None
-            if "ai" in selected_methods:
-                cve_details = compile_cve_details(
-                    cve_id, cve_data, epss_data, relevant_cisa_data, public_exploits)
-                risk_assessment = get_risk_assessment(
-                    ai_provider, cve_details, cve_data)
-                display_ai_risk_assessment(cve_details, cve_data, ai_provider)
-
-            priority = None
-            if "prio" in selected_methods:
-                priority = calculate_priority(
-                    cve_id,
-                    cve_data,
-                    epss_data,
-                    public_exploits.get("github_data"),
-                    relevant_cisa_data,
-                    public_exploits.get("vulncheck_data"),
-                    public_exploits.get("exploitdb_data"),
+
+def configure_run(config_path=None, debug=False, offline=False, record_dir=None,
+                  replay_dir=None, replay_latency=None):
+    """
+    Loads the config and sets the run-wide globals, including the HTTP cassette.
+    cli() calls it before any clone, sync or search step so those see the same
+    settings as main(); a repeated call with the same arguments keeps the
+    existing state, so cassette stats cover the whole run.
+    """
+    global config, debug_enabled, offline_enabled, http_cassette, _run_settings
+    settings = (config_path, debug, offline, record_dir, replay_dir, replay_latency)
+    if settings == _run_settings:
+        return
+    _run_settings = settings
+    debug_enabled = debug
+    offline_enabled = offline
+    http_cassette = None
+    if replay_dir:
+        http_cassette = HttpCassette(replay_dir, "replay", replay_latency)
+    elif record_dir:
+        http_cassette = HttpCassette(record_dir, "record")
+    config = load_config(config_path=config_path,
+                         debug=debug) if config_path else load_config(debug=debug)
+
+
+def main(cve_ids, export_format=None, import_file=None, import_type=None, ai_provider=None,
+         config_path=None, methods=None, debug=False, fast_mode=False, workers=None, ai_batch=None,
+         record_stream=None, offline=False, record_dir=None, replay_dir=None,
+         replay_latency=None):
+    configure_run(config_path=config_path, debug=debug, offline=offline, record_dir=record_dir,
+                  replay_dir=replay_dir, replay_latency=replay_latency)
+
+    if export_format:
+        export_format = export_format.lower()
+    record_stream = record_stream or sys.stdout
+
+    # NDJSON records are written to stdout for piping, so everything meant for
+    # people goes to stderr instead.
+    with (contextlib.redirect_stdout(sys.stderr) if export_format == "ndjson"
+          else contextlib.nullcontext()):
+        if offline:
+            manifest = load_offline_manifest()
+            if not manifest:
+                print("❌ No offline snapshot found. Run --sync on a connected host first.")
+                return
+            display_offline_snapshot(manifest)
+
+        if import_file:
+            cve_ids = import_vulnerability_data(import_file, import_type)
+        elif not cve_ids:
+            print("❌ No CVE IDs provided. Please provide CVE IDs or an import file.")
+            return
+
+        default_methods = ["cisa", "epss", "hackerone", "ai", "prio", "references"]
+        selected_methods = methods.split(",") if methods else default_methods
+        # Without --ai there is no provider to ask, so the assessment is skipped.
+        if "ai" in selected_methods and ai_provider not in AI_API_KEY_SETTINGS:
+            if methods:
+                print("⚠️ No AI provider selected (use --ai), skipping the AI risk assessment.")
+            selected_methods = [method for method in selected_methods if method != "ai"]
+
+        all_results = []
+        exporter = None
+        if export_format in ("ndjson", "csv"):
+            exporter = IncrementalExporter(
+                export_format, cve_ids=None if import_file else cve_ids, stream=record_stream)
+
+        def record_result(cve_result):
+            if not cve_result:
+                return
+            if exporter:
+                exporter.write(cve_result)
+            elif export_format:
+                all_results.append(cve_result)
+
+        workers = max(1, workers or get_config_value("workers", DEFAULT_WORKERS))
+        configure_http_session(pool_size=workers)
+
+        # With several CVEs, assessments run concurrently under the provider's
+        # rate budget; a single CVE is streamed to the terminal instead.
+        ai_workers = max(1, get_config_value("ai_workers", AI_WORKERS))
+        ai_batch = ai_batch or get_config_value("ai_batch_size", 0)
+        concurrent_ai = ("ai" in selected_methods and not fast_mode
+                         and (ai_workers > 1 or ai_batch > 1)
+                         and (import_file or len(cve_ids) > 1))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor, (
+            concurrent.futures.ThreadPoolExecutor(max_workers=ai_workers)
+            if concurrent_ai else contextlib.nullcontext()
+        ) as ai_executor:
+            ai_batcher = AiBatcher(ai_executor, ai_provider,
+                                   ai_batch) if ai_executor and ai_batch > 1 else None
+            epss_batcher = None
+            if "epss" in selected_methods and not fast_mode:
+                epss_batcher = EpssBatcher(
+                    executor,
+                    batch_size=get_config_value("epss_batch_size", EPSS_BATCH_SIZE),
+                    source="bulk" if offline else get_config_value("epss_source", "api"),
+                )
+                # Queue a given list up front so EPSS is resolved in a few chunked
+                # calls; imported CVEs are queued a batch ahead as the report is parsed.
+                if import_file:
+                    cve_ids = read_ahead_epss(cve_ids, epss_batcher)
+                else:
+                    for cve_id in cve_ids:
+                        if is_valid_cve_id(cve_id.upper()):
+                            epss_batcher.request(cve_id.upper())
+                    epss_batcher.flush()
+
+            pending = collections.deque()
+            processed_ids = []
+            for cve_id in cve_ids:
+                cve_id = cve_id.upper()
+                processed_ids.append(cve_id)
+                lookups = (
+                    submit_cve_lookups(executor, cve_id, selected_methods, fast_mode, epss_batcher)
+                    if is_valid_cve_id(cve_id)
+                    else None
                 )
-                display_priority_rating(cve_id, priority)
+                if ai_batcher and lookups:
+                    lookups["ai"] = ai_batcher.request(cve_id, lookups)
+                elif ai_executor and lookups:
+                    lookups["ai"] = ai_executor.submit(
+                        assess_cve_lookups, cve_id, lookups, ai_provider)
+                pending.append((cve_id, lookups))
+                # Keep a bounded number of CVEs in flight ahead of the one being printed.
+                while len(pending) > workers * 2:
+                    if epss_batcher:
+                        epss_batcher.ensure_dispatched(pending[0][0])
+                    if ai_batcher:
+                        ai_batcher.ensure_dispatched(pending[0][0])
+                    cve_result = display_cve_lookups(
+                        *pending.popleft(), selected_methods, ai_provider, fast_mode)
+                    record_result(cve_result)
+
+            if epss_batcher:
+                epss_batcher.flush()
+            if ai_batcher:
+                ai_batcher.flush()
+            while pending:
+                cve_result = display_cve_lookups(
+                    *pending.popleft(), selected_methods, ai_provider, fast_mode)
+                record_result(cve_result)
+
+        if not processed_ids:
+            print("❌ No valid CVE IDs found in the provided file.")
+            return
 
-            if "references" in selected_methods:
-                display_cve_references(cve_data)
+        if exporter:
+            exporter.close()
 
-        cve_result = {
-            "CVE Data": cve_data,
-            "EPSS Data": None if fast_mode else epss_data,
-            "CISA Data": {"cisa_status": "N/A", "ransomware_use": "N/A"} if fast_mode
-            else (relevant_cisa_data or {"cisa_status": "N/A", "ransomware_use": "N/A"}),
-            "Nuclei Data": None if fast_mode else public_exploits.get("nuclei_data"),
-            "GitHub Data": None if fast_mode else public_exploits.get("github_data"),
-            "VulnCheck Data": None if fast_mode else public_exploits.get("vulncheck_data"),
-            "ExploitDB Data": None if fast_mode else public_exploits.get("exploitdb_data"),
-            "PacketStorm Data": None if fast_mode else public_exploits.get("packetstorm_data"),
-            "HackerOne Data": None if fast_mode else hackerone_data,
-            "Priority": {"Priority": 0} if fast_mode else {"Priority": priority},
-            "Risk Assessment": None if fast_mode else risk_assessment,
-        }
-        all_results.append(cve_result)
+        if export_format == "json":
+            export_to_json(all_results, processed_ids)
+        elif export_format == "html":
+            export_to_html(all_results, processed_ids)
 
-    if export_format == "json":
-        export_to_json(all_results, cve_ids)
-    elif export_format == "csv":
-        export_to_csv(all_results, cve_ids)
-    elif export_format == "html":
-        export_to_html(all_results, cve_ids)
+        cache_totals = save_feed_cache_stats()
+        if debug and cache_totals:
+            print(f"Feed cache (this run): {json.dumps(feed_cache_stats)}")
+            print(f"Feed cache (all runs): {json.dumps(cache_totals)}")
+        debug_print(f"CVE records served by tier: {json.dumps(dict(cve_record_tiers))}")
+        if http_cassette:
+            print(f"📼 HTTP cassette '{http_cassette.directory}': "
+                  + ", ".join(f"{count} {name}" for name, count in sorted(http_cassette.stats.items())))
 
 
 def cli():
-    display_banner()
     parser = argparse.ArgumentParser(
         description="SploitScan: Retrieve and display vulnerability and exploit data for specified CVE ID(s)."
     )
     parser.add_argument("cve_ids", type=str, nargs="*", default=[],
                         help="Enter one or more CVE IDs (e.g., CVE-YYYY-NNNNN). This is optional if an import file is provided via -i.")
-    parser.add_argument("-e", "--export", choices=["json", "csv", "html"],
-                        help="Export the results in the specified format ('json', 'csv', or 'html').")
+    parser.add_argument("-e", "--export", choices=["json", "csv", "html", "ndjson"],
+                        help="Export the results in the specified format ('json', 'csv', 'html', or 'ndjson'). CSV rows are written as each CVE completes; 'ndjson' streams one record per CVE to stdout and prints everything else to stderr.")
     parser.add_argument("-t", "--type", choices=["nessus", "nexpose", "openvas", "docker"],
                         help="Specify the type of the import file ('nessus', 'nexpose', 'openvas', or 'docker').")
     parser.add_argument("--ai", type=str, choices=["openai", "google", "grok", "deepseek"],
                         help="Select the AI provider for risk assessment (e.g., 'openai', 'google', 'grok', or 'deepseek').")
+    parser.add_argument("--ai-batch", dest="ai_batch", type=int, metavar="N",
+                        help="Assess up to N CVEs per AI request when scanning several CVEs (opt-in, limited by the AI token budget).")
     parser.add_argument("-k", "--keywords", type=str, nargs='+',
                         help="Search for CVEs related to specific keywords (e.g., product name).")
+    parser.add_argument("--vendor", type=str,
+                        help="Find CVEs by affected vendor from the search index (exact, or a prefix ending in '*').")
+    parser.add_argument("--product", type=str,
+                        help="Find CVEs by affected product from the search index (exact, or a prefix ending in '*').")
+    parser.add_argument("--cpe", type=str,
+                        help="Find CVEs by CPE from the search index (exact, or a prefix ending in '*').")
+    parser.add_argument("--affected-version", dest="affected_version", type=str,
+                        help="With --vendor/--product/--cpe, keep only CVEs whose affected version ranges include this version.")
+    parser.add_argument("-y", "--year", type=parse_year_filter,
+                        help="Limit keyword search results to a CVE year or range (e.g., '2023' or '2019-2023').")
+    parser.add_argument("--build-index", dest="build_index", action="store_true",
+                        help="Build the keyword search index from the local cvelistV5 clone. Keyword searches use it automatically once built.")
+    parser.add_argument("--build-store", dest="build_store", action="store_true",
+                        help="Pack the local cvelistV5 clone into a compressed SQLite record store used by fast mode and CVE lookups.")
+    parser.add_argument("--changed-since", dest="changed_since", nargs="?", const="last-sync", metavar="REF|DATE",
+                        help="List and scan CVEs changed in the local database since the last sync (default), a date (YYYY-MM-DD) or a git revision.")
     parser.add_argument("-local", "--local-database", dest='local_database', action='store_true',
                         help="Download the cvelistV5 repository into the local directory. Use the local database over online research if available.")
+    parser.add_argument("--clone-mode", dest="clone_mode", choices=list(CLONE_OPTIONS),
+                        help="How -local clones cvelistV5 the first time: 'full' history (default), 'shallow' (depth 1), 'partial' (blob-filtered) or 'sparse' (depth 1, cves/ only).")
+    parser.add_argument("--sync", action="store_true",
+                        help="Update the local cvelistV5 database and snapshot all bulk feeds (CISA KEV, EPSS, ExploitDB, Nuclei) for --offline use.")
+    parser.add_argument("--offline", action="store_true",
+                        help="Make no network calls: resolve CVEs and feeds only from the local database and the --sync snapshot.")
+    parser.add_argument("--record", dest="record_dir", metavar="DIR",
+                        help="Save every HTTP response of this run into a cassette directory for --replay.")
+    parser.add_argument("--replay", dest="replay_dir", metavar="DIR",
+                        help="Serve HTTP responses from a --record cassette instead of the network.")
+    parser.add_argument("--replay-latency", dest="replay_latency", type=parse_replay_latency, metavar="SECONDS",
+                        help="Delay each replayed response by SECONDS, or by its recorded duration with 'recorded'.")
     parser.add_argument("-f", "--fast-mode", dest='fast_mode', action='store_true',
                         help="Enable fast mode: only display basic CVE information without fetching additional exploits or data.")
     parser.add_argument("-m", "--methods", type=str,
@@ -1485,16 +4017,64 @@ def cli():
                         help="Path to a custom configuration file.")
     parser.add_argument("-d", "--debug", action="store_true",
                         help="Enable debug output.")
+    parser.add_argument("-w", "--workers", type=int,
+                        help=f"Number of concurrent lookups across all CVEs and sources (default: {DEFAULT_WORKERS}).")
 
     args = parser.parse_args()
 
-    if args.local_database:
-        clone_cvelistV5_repo()
+    record_stream = sys.stdout
+    if args.export == "ndjson":
+        sys.stdout = sys.stderr
+    display_banner()
+
+    if args.record_dir and args.replay_dir:
+        sys.exit("--record and --replay cannot be used together.")
+
+    if args.sync and args.offline:
+        sys.exit("--sync needs network access and cannot be combined with --offline.")
+
+    if args.local_database and args.offline:
+        sys.exit("-local clones or pulls cvelistV5 and cannot be combined with --offline.")
+
+    # Clone, sync and search steps below read the config and must already see
+    # --offline and the HTTP cassette, so set all of them up first.
+    configure_run(config_path=args.config, debug=args.debug, offline=args.offline,
+                  record_dir=args.record_dir, replay_dir=args.replay_dir,
+                  replay_latency=args.replay_latency)
+
+    if args.sync:
+        sync_offline_bundle(clone_mode=args.clone_mode)
+        if not (args.cve_ids or args.import_file or args.keywords or args.changed_since
+                or args.vendor or args.product or args.cpe):
+            return
+    elif args.local_database:
+        clone_cvelistV5_repo(clone_mode=args.clone_mode)
+
+    if args.build_index:
+        build_search_index()
+
+    if args.build_store:
+        build_record_store()
 
     if args.keywords:
-        cve_ids = search_cve_by_keywords(args.keywords)
+        cve_ids = search_cve_by_keywords(args.keywords, years=args.year)
         if not cve_ids:
             sys.exit("No valid CVE IDs found for the provided keywords.")
+    elif args.vendor or args.product or args.cpe:
+        cve_ids = search_products(args.vendor, args.product, args.cpe,
+                                  args.affected_version, years=args.year)
+        if cve_ids is None:
+            # Without a usable product index, look the names up as keywords.
+            keywords = [name.rstrip("*") for name in (args.vendor, args.product) if name]
+            if keywords:
+                print("⚠️ Falling back to a keyword search for the vendor and product names.")
+                cve_ids = search_cve_by_keywords(keywords, years=args.year)
+        if not cve_ids:
+            sys.exit("No CVEs found for the provided product query.")
+    elif args.changed_since:
+        cve_ids = list_changed_cves(args.changed_since)
+        if not cve_ids:
+            sys.exit("No changed CVEs found in the local database.")
     else:
         cve_ids = args.cve_ids
 
@@ -1506,7 +4086,14 @@ def cli():
          config_path=args.config,
          methods=args.methods,
          debug=args.debug,
-         fast_mode=args.fast_mode)
+         fast_mode=args.fast_mode,
+         workers=args.workers,
+         ai_batch=args.ai_batch,
+         record_stream=record_stream,
+         offline=args.offline,
+         record_dir=args.record_dir,
+         replay_dir=args.replay_dir,
+         replay_latency=args.replay_latency)
 
 
 if __name__ == "__main__":
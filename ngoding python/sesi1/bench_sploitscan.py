@@ -0,0 +1,495 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmarks for 10.py (SploitScan).
+
+  startup   Loads the module under `python -X importtime` and compares it with
+            an "eager" start that imports every optional dependency up front,
+            the way 10.py did before those imports were deferred. Also times
+            `10.py --help` and a fast-mode lookup served from a local record
+            end to end, and checks that the lookup never loads requests.
+  pipeline  Runs main() over 10/100/1,000/10,000 CVEs against a local
+            stand-in for every upstream API, with configurable latency, error
+            rate and payload size, and reports throughput, per-CVE latency,
+            peak RSS and bytes transferred.
+"""
+
+import argparse
+import contextlib
+import csv
+import gzip
+import http.server
+import importlib.util
+import io
+import json
+import os
+import random
+import re
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "10.py")
+OPTIONAL_DEPENDENCIES = ["requests", "tqdm", "git", "google.genai", "openai", "jinja2"]
+DEFAULT_SIZES = "10,100,1000,10000"
+DEFAULT_METHODS = "cisa,epss,hackerone,prio,references"
+LOCAL_CVE_ID = "CVE-2024-10000"
+
+LOAD_SCRIPT = (
+    "import importlib.util\n"
+    "spec = importlib.util.spec_from_file_location('sploitscan', {path!r})\n"
+    "module = importlib.util.module_from_spec(spec)\n"
+    "spec.loader.exec_module(module)\n"
+)
+EAGER_IMPORT = (
+    "try:\n"
+    "    import {name}\n"
+    "except ImportError:\n"
+    "    pass\n"
+)
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)")
+
+
+def run_importtime(code):
+    """
+    Runs `code` in a fresh interpreter with -X importtime. Returns the wall
+    time in seconds and the cumulative microseconds of each top-level import.
+    """
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        sys.exit(f"❌ Benchmark run failed:\n{result.stderr[-2000:]}")
+
+    top_level = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match and len(match.group(3)) == 1:
+            top_level[match.group(4)] = int(match.group(2))
+    return elapsed, top_level
+
+
+def measure(code, runs):
+    walls, imports = [], []
+    for _ in range(runs):
+        elapsed, top_level = run_importtime(code)
+        walls.append(elapsed)
+        imports.append(top_level)
+    return walls, imports[-1]
+
+
+def measure_help(runs):
+    walls = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, SCRIPT, "--help"], capture_output=True, check=True)
+        walls.append(time.perf_counter() - start)
+    return walls
+
+
+def measure_local_lookup(runs):
+    """
+    Times `10.py -f` for a CVE whose record is in a temporary local database.
+    Returns the wall times and the network modules the run imported.
+    """
+    walls, network_modules = [], set()
+    with tempfile.TemporaryDirectory(prefix="sploitscan-bench-") as home:
+        record_dir = os.path.join(home, "cvelistV5", "cves", "2024", "10xxx")
+        os.makedirs(record_dir)
+        with open(os.path.join(record_dir, f"{LOCAL_CVE_ID}.json"), "w", encoding="utf-8") as file:
+            json.dump(build_cve_record(LOCAL_CVE_ID, 1024), file)
+        config_path = os.path.join(home, "config.json")
+        with open(config_path, "w", encoding="utf-8") as file:
+            json.dump({"local_database_dir": home}, file)
+
+        env = dict(os.environ, HOME=home)
+        command = [sys.executable, "-X", "importtime", SCRIPT, "-f", "-c", config_path, LOCAL_CVE_ID]
+        for _ in range(runs):
+            start = time.perf_counter()
+            result = subprocess.run(command, capture_output=True, text=True, env=env)
+            walls.append(time.perf_counter() - start)
+            if result.returncode != 0 or LOCAL_CVE_ID not in result.stdout:
+                sys.exit(f"❌ Local lookup failed:\n{result.stderr[-2000:]}")
+            for line in result.stderr.splitlines():
+                match = IMPORTTIME_LINE.match(line)
+                if match and match.group(4).split(".")[0] in ("requests", "urllib3"):
+                    network_modules.add(match.group(4).split(".")[0])
+    return walls, network_modules
+
+
+def available_dependencies():
+    found = []
+    for name in OPTIONAL_DEPENDENCIES:
+        result = subprocess.run([sys.executable, "-c", f"import {name}"], capture_output=True)
+        if result.returncode == 0:
+            found.append(name)
+    return found
+
+
+def format_ms(seconds):
+    return f"{seconds * 1000:8.1f} ms"
+
+
+def bench_startup(args):
+    dependencies = available_dependencies()
+    missing = sorted(set(OPTIONAL_DEPENDENCIES) - set(dependencies))
+    lazy_code = LOAD_SCRIPT.format(path=SCRIPT)
+    eager_code = "".join(EAGER_IMPORT.format(name=name) for name in dependencies) + lazy_code
+
+    baseline, _ = measure("pass", args.runs)
+    lazy, lazy_imports = measure(lazy_code, args.runs)
+    eager, _ = measure(eager_code, args.runs)
+    help_runs = measure_help(args.runs)
+    local_runs, network_modules = measure_local_lookup(args.runs)
+
+    print(f"Python {sys.version.split()[0]}, {args.runs} run(s) each, median wall time")
+    if missing:
+        print(f"Not installed (left out of the eager start): {', '.join(missing)}")
+    print()
+    print(f"  interpreter only        {format_ms(statistics.median(baseline))}")
+    print(f"  import 10.py (lazy)     {format_ms(statistics.median(lazy))}")
+    print(f"  import 10.py (eager)    {format_ms(statistics.median(eager))}")
+    print(f"  10.py --help            {format_ms(statistics.median(help_runs))}")
+    print(f"  10.py -f (local record) {format_ms(statistics.median(local_runs))}"
+          + (f"  ⚠️ loaded {', '.join(sorted(network_modules))}" if network_modules else ""))
+    saved = statistics.median(eager) - statistics.median(lazy)
+    share = saved / (statistics.median(eager) - statistics.median(baseline) or 1) * 100
+    print(f"  startup saved           {format_ms(saved)} ({share:.0f}% of module load)")
+    print()
+    print("Slowest top-level imports when loading 10.py (cumulative):")
+    for name, micros in sorted(lazy_imports.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {name:<28}{micros / 1000:8.1f} ms")
+
+
+def bench_cve_ids(count):
+    return [f"CVE-2024-{10000 + index}" for index in range(count)]
+
+
+def build_feeds(cve_ids):
+    """
+    Builds the bulk feeds for a CVE list: every 10th CVE is in CISA KEV, every
+    7th has a Nuclei template and every 5th an ExploitDB entry.
+    """
+    kev = {"vulnerabilities": [
+        {"cveID": cve_id, "vendorProject": "Bench", "product": f"Product {index % 50}",
+         "vulnerabilityName": "Benchmark vulnerability", "knownRansomwareCampaignUse": "Unknown"}
+        for index, cve_id in enumerate(cve_ids) if index % 10 == 0
+    ]}
+    nuclei = "".join(
+        json.dumps({"ID": cve_id, "file_path": f"http/cves/2024/{cve_id}.yaml"}) + "\n"
+        for index, cve_id in enumerate(cve_ids) if index % 7 == 0
+    )
+    exploitdb = io.StringIO()
+    writer = csv.writer(exploitdb)
+    writer.writerow(["id", "file", "description", "date_published", "author", "type",
+                     "platform", "port", "date_added", "date_updated", "verified", "codes"])
+    for index, cve_id in enumerate(cve_ids):
+        if index % 5 == 0:
+            writer.writerow([50000 + index, "exploits/x.py", "Bench exploit", "2024-01-01",
+                             "bench", "remote", "linux", "0", "", "", "1", cve_id])
+    epss = "#model_version:v2023.03.01,score_date:2024-01-01\ncve,epss,percentile\n" + "".join(
+        f"{cve_id},{(index % 100) / 100:.5f},0.50000\n" for index, cve_id in enumerate(cve_ids))
+    return {
+        "/kev": json.dumps(kev).encode(),
+        "/nuclei": nuclei.encode(),
+        "/exploitdb": exploitdb.getvalue().encode(),
+        "/epss-bulk": gzip.compress(epss.encode()),
+    }
+
+
+def build_cve_record(cve_id, payload_size):
+    return {
+        "dataType": "CVE_RECORD",
+        "cveMetadata": {"cveId": cve_id, "state": "PUBLISHED", "datePublished": "2024-01-01T00:00:00"},
+        "containers": {"cna": {
+            "descriptions": [{"lang": "en", "value": "Benchmark vulnerability. " + "x" * payload_size}],
+            "metrics": [{"cvssV3_1": {"baseScore": 9.8, "baseSeverity": "CRITICAL",
+                                      "vectorString": "CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:H/A:H"}}],
+            "affected": [{"vendor": "Bench", "product": "Product", "versions": [
+                {"version": "1.0", "lessThan": "2.0", "status": "affected"}]}],
+            "references": [{"url": f"https://example.com/{cve_id}/{index}"} for index in range(5)],
+        }},
+    }
+
+
+class FakeUpstream:
+    """
+    A local HTTP server that stands in for every upstream SploitScan talks to.
+    Each response waits `latency` seconds, fails with 503 at `error_rate`,
+    and CVE records carry `payload_size` bytes of description.
+    """
+
+    def __init__(self, latency=0.0, error_rate=0.0, payload_size=1024, seed=1):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.payload_size = payload_size
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.feeds = {}
+        self.reset()
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), self.make_handler())
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def reset(self, cve_ids=()):
+        with self.lock:
+            self.feeds = build_feeds(list(cve_ids))
+            self.stats = {"requests": 0, "errors": 0, "bytes_sent": 0, "bytes_received": 0}
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
+
+    def urls(self):
+        base = self.base_url
+        return {
+            "CVE_GITHUB_URL": f"{base}/cves",
+            "EPSS_API_URL": f"{base}/epss?cve={{cve_id}}",
+            "EPSS_BULK_URL": f"{base}/epss-bulk",
+            "CISA_URL": f"{base}/kev",
+            "NUCLEI_URL": f"{base}/nuclei",
+            "GITHUB_API_URL": f"{base}/poc",
+            "VULNCHECK_API_URL": f"{base}/vulncheck",
+            "EXPLOITDB_URL": f"{base}/exploitdb",
+            "PACKETSTORM_URL": f"{base}/packetstorm?q={{cve_id}}",
+            "HACKERONE_URL": f"{base}/hackerone",
+        }
+
+    def respond(self, method, path, query, body):
+        if path in self.feeds:
+            return 200, "application/octet-stream", self.feeds[path]
+        if path.startswith("/cves/"):
+            cve_id = os.path.basename(path)[:-5]
+            return 200, "application/json", json.dumps(
+                build_cve_record(cve_id, self.payload_size)).encode()
+        if path == "/epss":
+            cve_ids = query.get("cve", [""])[0].split(",")
+            data = [{"cve": cve_id, "epss": "0.42000", "percentile": "0.90000", "date": "2024-01-01"}
+                    for cve_id in cve_ids if cve_id]
+            return 200, "application/json", json.dumps({"status": "OK", "data": data}).encode()
+        if path == "/poc":
+            cve_id = query.get("cve_id", [""])[0]
+            pocs = [{"html_url": f"https://github.com/bench/{cve_id}", "created_at": "2024-01-02T00:00:00Z"}]
+            return 200, "application/json", json.dumps({"pocs": pocs}).encode()
+        if path == "/vulncheck":
+            return 200, "application/json", json.dumps({"data": []}).encode()
+        if path == "/packetstorm":
+            return 200, "text/html", b"<html><body>No Results Found</body></html>"
+        if path == "/hackerone" and method == "POST":
+            entry = {"rank": 1, "reports_submitted_count": 0, "severity_count_unknown": 0,
+                     "severity_count_none": 0, "severity_count_low": 0, "severity_count_medium": 0,
+                     "severity_count_high": 0, "severity_count_critical": 0}
+            return 200, "application/json", json.dumps({"data": {"cve_entry": entry}}).encode()
+        return 404, "text/plain", b"not found"
+
+    def make_handler(self):
+        upstream = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def handle_request(self, method):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                parsed = urllib.parse.urlsplit(self.path)
+                if upstream.latency:
+                    time.sleep(upstream.latency)
+                with upstream.lock:
+                    failed = upstream.random.random() < upstream.error_rate
+                if failed:
+                    status, content_type, payload = 503, "text/plain", b"injected error"
+                else:
+                    status, content_type, payload = upstream.respond(
+                        method, parsed.path, urllib.parse.parse_qs(parsed.query), body)
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                if failed:
+                    self.send_header("Retry-After", "0")
+                self.end_headers()
+                self.wfile.write(payload)
+                with upstream.lock:
+                    upstream.stats["requests"] += 1
+                    upstream.stats["errors"] += failed
+                    upstream.stats["bytes_sent"] += len(payload)
+                    upstream.stats["bytes_received"] += len(body) + len(self.path)
+
+            def do_GET(self):
+                self.handle_request("GET")
+
+            def do_POST(self):
+                self.handle_request("POST")
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def load_sploitscan():
+    spec = importlib.util.spec_from_file_location("sploitscan", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["sploitscan"] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def percentile(values, share):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(share * (len(ordered) - 1))))]
+
+
+def run_pipeline_worker(args):
+    """
+    Runs in a fresh interpreter so peak RSS belongs to one run: points 10.py at
+    the stand-in server, scans `args.cves` CVEs and prints the results as JSON.
+    """
+    sploitscan = load_sploitscan()
+    urls = json.loads(args.urls)
+    for name, url in urls.items():
+        setattr(sploitscan, name, url)
+    sploitscan.OFFLINE_FEEDS.update(
+        cisa_kev=urls["CISA_URL"], nuclei_cves=urls["NUCLEI_URL"],
+        exploitdb=urls["EXPLOITDB_URL"], epss_scores=urls["EPSS_BULK_URL"])
+
+    started, finished = {}, {}
+    submit_cve_lookups = sploitscan.submit_cve_lookups
+    display_cve_lookups = sploitscan.display_cve_lookups
+
+    def timed_submit(executor, cve_id, *rest, **kwargs):
+        started[cve_id] = time.perf_counter()
+        return submit_cve_lookups(executor, cve_id, *rest, **kwargs)
+
+    def timed_display(cve_id, *rest, **kwargs):
+        result = display_cve_lookups(cve_id, *rest, **kwargs)
+        finished[cve_id] = time.perf_counter()
+        return result
+
+    sploitscan.submit_cve_lookups = timed_submit
+    sploitscan.display_cve_lookups = timed_display
+
+    cve_ids = bench_cve_ids(args.cves)
+    # Caches, stores and anything else written under ~ go to a directory that
+    # is removed after the run.
+    with tempfile.TemporaryDirectory(prefix="sploitscan-bench-") as work_dir:
+        os.environ["HOME"] = work_dir
+        config_path = os.path.join(work_dir, "config.json")
+        with open(config_path, "w", encoding="utf-8") as file:
+            json.dump({"local_database_dir": work_dir, "vulncheck_api_key": "bench",
+                       "http_max_retries": args.max_retries}, file)
+
+        start = time.perf_counter()
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            sploitscan.main(cve_ids, config_path=config_path, methods=args.methods,
+                            fast_mode=args.fast_mode, workers=args.workers)
+        elapsed = time.perf_counter() - start
+
+    latencies = [finished[cve_id] - started[cve_id] for cve_id in finished if cve_id in started]
+    print(json.dumps({
+        "cves": args.cves,
+        "elapsed": elapsed,
+        "latencies": latencies,
+        # ru_maxrss is in KiB on Linux and in bytes on macOS.
+        "peak_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        * (1 if sys.platform == "darwin" else 1024),
+    }))
+
+
+def bench_pipeline(args):
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    upstream = FakeUpstream(latency=args.latency / 1000, error_rate=args.error_rate,
+                            payload_size=args.payload_kb * 1024)
+    upstream.start()
+    print(f"Stand-in upstream at {upstream.base_url}: latency {args.latency} ms, "
+          f"error rate {args.error_rate:.1%}, CVE payload {args.payload_kb} KiB")
+    print(f"methods={args.methods}{' (fast mode)' if args.fast_mode else ''}, "
+          f"workers={args.workers or 'default'}\n")
+    print(f"{'CVEs':>7} {'wall':>9} {'CVE/s':>8} {'p50':>9} {'p95':>9} "
+          f"{'peak RSS':>10} {'sent':>10} {'received':>10} {'requests':>9} {'errors':>7}")
+
+    try:
+        for size in sizes:
+            upstream.reset(bench_cve_ids(size))
+            command = [sys.executable, os.path.abspath(__file__), "pipeline-worker",
+                       "--cves", str(size), "--urls", json.dumps(upstream.urls()),
+                       "--methods", args.methods, "--max-retries", str(args.max_retries)]
+            if args.workers:
+                command += ["--workers", str(args.workers)]
+            if args.fast_mode:
+                command.append("--fast-mode")
+            result = subprocess.run(command, capture_output=True, text=True)
+            if result.returncode != 0:
+                sys.exit(f"❌ Benchmark run for {size} CVEs failed:\n{result.stderr[-2000:]}")
+            run = json.loads(result.stdout.strip().splitlines()[-1])
+            stats = upstream.stats
+            print(f"{size:>7} {run['elapsed']:>8.2f}s {size / run['elapsed']:>8.1f} "
+                  f"{format_ms(percentile(run['latencies'], 0.5)).strip():>9} "
+                  f"{format_ms(percentile(run['latencies'], 0.95)).strip():>9} "
+                  f"{run['peak_rss'] / 1048576:>7.1f} MiB "
+                  f"{stats['bytes_sent'] / 1048576:>6.2f} MiB "
+                  f"{stats['bytes_received'] / 1048576:>6.2f} MiB "
+                  f"{stats['requests']:>9} {stats['errors']:>7}")
+    finally:
+        upstream.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SploitScan benchmarks.")
+    commands = parser.add_subparsers(dest="command")
+
+    startup = commands.add_parser("startup", help="Measure cold-start time (default).")
+    startup.add_argument("-n", "--runs", type=int, default=10,
+                         help="Interpreter starts per measurement (default: 10).")
+    startup.add_argument("--top", type=int, default=10,
+                         help="Number of slowest top-level imports to list (default: 10).")
+
+    pipeline = commands.add_parser("pipeline", help="Run main() against a local stand-in upstream.")
+    pipeline.add_argument("--sizes", default=DEFAULT_SIZES,
+                          help=f"Comma-separated CVE counts to scan (default: {DEFAULT_SIZES}).")
+    pipeline.add_argument("--latency", type=float, default=0.0,
+                          help="Milliseconds each upstream response is delayed (default: 0).")
+    pipeline.add_argument("--error-rate", type=float, default=0.0,
+                          help="Share of upstream responses that fail with 503 (default: 0).")
+    pipeline.add_argument("--payload-kb", type=int, default=1,
+                          help="KiB of description text in each CVE record (default: 1).")
+    pipeline.add_argument("--methods", default=DEFAULT_METHODS,
+                          help=f"Methods passed to main() (default: {DEFAULT_METHODS}).")
+    pipeline.add_argument("--workers", type=int,
+                          help="Concurrent lookups passed to main() (default: 10.py's default).")
+    pipeline.add_argument("--max-retries", type=int, default=4,
+                          help="http_max_retries for the scanned runs (default: 4).")
+    pipeline.add_argument("--fast-mode", action="store_true",
+                          help="Benchmark fast mode instead of a full scan.")
+
+    worker = commands.add_parser("pipeline-worker")
+    worker.add_argument("--cves", type=int, required=True)
+    worker.add_argument("--urls", required=True)
+    worker.add_argument("--methods", default=DEFAULT_METHODS)
+    worker.add_argument("--workers", type=int)
+    worker.add_argument("--max-retries", type=int, default=4)
+    worker.add_argument("--fast-mode", action="store_true")
+
+    args = parser.parse_args()
+    if args.command == "pipeline":
+        bench_pipeline(args)
+    elif args.command == "pipeline-worker":
+        run_pipeline_worker(args)
+    else:
+        if args.command is None:
+            args = parser.parse_args(["startup"])
+        bench_startup(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import importlib.util
+import json
+import os
+import unittest
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "10.py")
+spec = importlib.util.spec_from_file_location("sploitscan", SCRIPT)
+sploitscan = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(sploitscan)
+
+SARIF = json.dumps({
+    "version": "2.1.0",
+    "runs": [{
+        "results": [{"ruleId": "CVE-2023-1111", "rank": -12.5e-3,
+                     "properties": {"related": [{"id": "CVE-2000-0002"}], "score": 1E+5}}],
+        "tool": {"driver": {"name": "docker scout", "rules": [
+            {"id": "CVE-2023-1111", "properties": {"cvssV3": 9.8, "count": 120}},
+            {"id": "GHSA-xxxx", "properties": {"cvssV3": 5}},
+            {"id": "CVE-2024-22222", "properties": {"cvssV3": -0.0}},
+        ]}},
+        "z": [1e5, 0.25, -7, 3.0E-2, 123456789],
+    }],
+    "trailing": 42,
+})
+
+
+class SplitFile:
+    """
+    A text file whose reads return the given pieces one at a time.
+    """
+
+    def __init__(self, *pieces):
+        self.pieces = [piece for piece in pieces if piece]
+
+    def read(self, size=-1):
+        return self.pieces.pop(0) if self.pieces else ""
+
+
+class JsonStreamReaderTest(unittest.TestCase):
+    def test_rules_at_every_split_offset(self):
+        for offset in range(len(SARIF) + 1):
+            with self.subTest(offset=offset):
+                file = SplitFile(SARIF[:offset], SARIF[offset:])
+                self.assertEqual(list(sploitscan.parse_docker_file(file)),
+                                 ["CVE-2023-1111", "CVE-2024-22222"])
+
+    def test_numbers_at_every_split_offset(self):
+        document = '{"runs":[],"z":[1e5, -0.25E+3, 10, 7.5]}'
+        for offset in range(len(document) + 1):
+            with self.subTest(offset=offset):
+                reader = sploitscan.JsonStreamReader(SplitFile(document[:offset], document[offset:]))
+                self.assertEqual(list(reader.select(("z", "*"))), [1e5, -250.0, 10, 7.5])
+                reader.end()
+
+    def test_invalid_json_raises(self):
+        for document in ('{"runs": [ broken', '{"runs": []} x', '{"a" 1}', ""):
+            with self.subTest(document=document):
+                with self.assertRaises(json.JSONDecodeError):
+                    list(sploitscan.parse_docker_file(SplitFile(document)))
+
+
+if __name__ == "__main__":
+    unittest.main()